@@ -11,38 +11,82 @@ Flow:
 7. Create PowerPoint and script
 8. Return files
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response, StreamingResponse
 import uvicorn
+import aiofiles
 from dotenv import load_dotenv
 from pydantic import BaseModel
 from pathlib import Path
-import tempfile
+from typing import AsyncIterator, Dict, Literal, Tuple
 import asyncio
+import json
+import atexit
+import logging
+import logging.handlers
+import queue
+import hashlib
+import os
+import shutil
+from stat import S_ISREG
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+# Load .env before importing services: some read settings at import time
+load_dotenv()
 
 # Import services
-from tools.tools import get_repo, cleanup_repo
-from vectorstore.indexer import index_repo
+from tools.tools import get_repo, cleanup_repo, get_remote_head_sha
+from vectorstore.indexer import index_repo, is_index_fresh
 from vectorstore.retrieval import retrieve_context
 from vectorstore.store import get_repo_hash
 from services.sector_analyzer import analyze_repository_sector
 from market_analysis.analyzer import generate_market_analysis
 from services.pitch_deck_service import generate_pitch_deck_structure
+from services.dedalus_client import close_dedalus_client
 from pitch_deck.generator import (
     TARGET_AUDIENCES,
     create_powerpoint,
     generate_script
 )
+from pitch_deck.cache import (
+    get_pitch_deck_cache_key,
+    get_cached_pitch_deck,
+    cache_pitch_deck,
+    clear_expired_pitch_decks
+)
 from market_analysis.cache import get_cache_stats, clear_expired_cache
+from market_analysis.google_market_search import (
+    close_browser,
+    close_http_client,
+    shutdown_parse_pool
+)
 from routers import github
 
-load_dotenv()
+# Log records are queued and written by a background listener thread so
+# request handlers never block on stdout
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(
+    _log_queue,
+    logging.StreamHandler(),
+    respect_handler_level=True
+)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+logger = logging.getLogger("pitchdeck")
 
 app = FastAPI(
     title="Pitch Deck Generator API",
     description="AI-powered pitch deck generation from GitHub repositories",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS for frontend
@@ -50,20 +94,90 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://localhost:3000"],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "Authorization", "If-None-Match"],
 )
 
 app.include_router(github.router, prefix="/api/github", tags=["github"])
 
+# Generated PowerPoint/script files and their cache sidecars
+PITCH_DECK_DIR = Path("temp_pitch_decks")
+
+# Media types for downloadable pitch deck files, by suffix
+_DOWNLOAD_MEDIA_TYPES = {
+    ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    ".txt": "text/plain",
+}
+
+# Reuse a repository's vector index (skip clone + index) for this long
+INDEX_TTL_SECONDS = 60 * 60
+
+# PowerPoint rendering is CPU-bound Python (XML building + zip), so it runs in
+# worker processes instead of competing for the GIL with request handling.
+# Created on first use; spawned (not forked) so workers don't inherit the
+# server's threads, locks and open clients
+_RENDER_POOL: ProcessPoolExecutor | None = None
+
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    global _RENDER_POOL
+    if _RENDER_POOL is None:
+        _RENDER_POOL = ProcessPoolExecutor(max_workers=2, mp_context=get_context("spawn"))
+    return _RENDER_POOL
+
+
+# Written once repo data named by the pre-BLAKE2b repo hash has been removed
+_REPO_HASH_MIGRATION_MARKER = Path(".vectordb") / ".repo_hash_blake2b"
+
+
+@app.on_event("startup")
+def _remove_pre_blake2b_repo_data():
+    # Old and new repo hashes are both 16 hex chars, so old-named indexes and
+    # decks can't be told apart by name; drop them all once and re-index on
+    # demand instead of leaving the old ones orphaned
+    if _REPO_HASH_MIGRATION_MARKER.exists():
+        return
+    for repo_dir in Path(".vectordb").glob("repo_*"):
+        shutil.rmtree(repo_dir, ignore_errors=True)
+    for pattern in ("pitch_deck_*.pptx", "script_*.txt"):
+        for path in PITCH_DECK_DIR.glob(pattern):
+            path.unlink(missing_ok=True)
+    _REPO_HASH_MIGRATION_MARKER.parent.mkdir(parents=True, exist_ok=True)
+    _REPO_HASH_MIGRATION_MARKER.touch()
+    logger.info("step=migrated reason=repo_hash_blake2b")
+
+
+@app.on_event("shutdown")
+def _shutdown_worker_pools():
+    if _RENDER_POOL is not None:
+        _RENDER_POOL.shutdown(wait=False, cancel_futures=True)
+    shutdown_parse_pool()
+
+
+@app.on_event("shutdown")
+async def _close_llm_client():
+    await close_dedalus_client()
+
+
+@app.on_event("shutdown")
+async def _close_search_clients():
+    await close_http_client()
+    await close_browser()
+
 
 # ============================================================================
 # REQUEST/RESPONSE MODELS
 # ============================================================================
 
+# Unknown audiences are rejected by request validation (422) instead of
+# failing after the repository has already been cloned and indexed
+AudienceKey = Literal[tuple(TARGET_AUDIENCES)]
+
+
 class PitchDeckRequest(BaseModel):
     repository_url: str
-    audience_key: str = "general_audience"
+    audience_key: AudienceKey = "general_audience"
+    use_cache: bool = True
 
 
 class PitchDeckResponse(BaseModel):
@@ -74,6 +188,26 @@ class PitchDeckResponse(BaseModel):
     error: str = None
 
 
+def _pitch_deck_result(
+    pitch_deck_structure: dict,
+    filename: str,
+    script_filename: str,
+    from_cache: bool = False
+) -> dict:
+    """Build the success payload with download URLs (matches old code format)."""
+    return {
+        "success": True,
+        "message": "Pitch deck generated successfully",
+        "format": "pptx",
+        "download_url": f"/download-pitch-deck/{filename}",
+        "script_url": f"/download-pitch-deck/{script_filename}",
+        "pitch_data": pitch_deck_structure,
+        "powerpoint_path": str(PITCH_DECK_DIR / filename),
+        "script_path": str(PITCH_DECK_DIR / script_filename),
+        "from_cache": from_cache
+    }
+
+
 # ============================================================================
 # ENDPOINTS
 # ============================================================================
@@ -93,193 +227,321 @@ async def get_target_audiences():
     """Get available target audiences."""
     return {
         "audiences": [
-            {"key": key, **config}
+            {"key": key, **{field: value for field, value in config.items() if field != "requirements"}}
             for key, config in TARGET_AUDIENCES.items()
         ]
     }
 
 
-@app.post("/generate-pitch-deck")
-async def generate_pitch_deck(body: PitchDeckRequest):
+async def _pitch_deck_pipeline(body: PitchDeckRequest) -> AsyncIterator[Tuple[str, dict]]:
     """
-    Generate pitch deck from GitHub repository.
+    Run the pitch deck pipeline, yielding (step, data) as each stage completes.
+    
+    The last event is ("complete", result) with the download URLs.
     
     Flow:
     1. Index repository
     2. Retrieve context
     3. Analyze sector
-    4. Generate market analysis (parallel)
-    5. Generate pitch deck (parallel)
+    4. Generate market analysis (concurrently with 5)
+    5. Generate pitch deck (awaits market data only for its prompt)
     6. Create files
     """
-    try:
-        # ====================================================================
-        # STEP 1: INDEX REPOSITORY
-        # ====================================================================
-        print(f"\n{'='*60}")
-        print(f"📦 STEP 1: Indexing repository")
-        print(f"{'='*60}")
-        
-        repo_hash = get_repo_hash(body.repository_url)
-        persist_dir = f".vectordb/repo_{repo_hash}"
-        
-        # Clone and index
-        repo_path = get_repo(body.repository_url)
-        index_repo(repo_path, body.repository_url, persist_dir)
-        cleanup_repo(repo_path)
-        
-        print(f"✓ Repository indexed successfully\n")
-        
-        # ====================================================================
-        # STEP 2: RETRIEVE CONTEXT
-        # ====================================================================
-        print(f"{'='*60}")
-        print(f"📚 STEP 2: Retrieving context from vector database")
-        print(f"{'='*60}")
-        
-        # Retrieve more context to prevent hallucination
-        query = f"Analyze this repository: {body.repository_url}. Focus on: dependencies, tech stack, architecture, features, and implementation details."
-        context = retrieve_context(
+    # ====================================================================
+    # STEP 1: INDEX REPOSITORY
+    # ====================================================================
+    logger.info("step=index repo=%s audience=%s", body.repository_url, body.audience_key)
+    
+    audience_cfg = TARGET_AUDIENCES[body.audience_key]
+    
+    repo_hash = get_repo_hash(body.repository_url)
+    persist_dir = f".vectordb/repo_{repo_hash}"
+    
+    # Same commit + audience already generated? Skip the whole pipeline
+    cache_key = None
+    commit_sha = None
+    if body.use_cache:
+        commit_sha = await asyncio.to_thread(get_remote_head_sha, body.repository_url)
+        if commit_sha:
+            cache_key = get_pitch_deck_cache_key(repo_hash, commit_sha, body.audience_key)
+            cached = get_cached_pitch_deck(cache_key, PITCH_DECK_DIR)
+            if cached:
+                logger.info("step=cache_hit commit=%s key=%s", commit_sha[:8], cache_key[:8])
+                yield "complete", _pitch_deck_result(
+                    cached["pitch_data"],
+                    cached["pptx_filename"],
+                    cached["script_filename"],
+                    from_cache=True
+                )
+                return
+    
+    # Retrieve more context to prevent hallucination
+    query = f"Analyze this repository: {body.repository_url}. Focus on: dependencies, tech stack, architecture, features, and implementation details."
+    
+    def start_retrieval() -> asyncio.Task:
+        return asyncio.create_task(asyncio.to_thread(
+            retrieve_context,
             query=query,
             repo_url=body.repository_url,
             k=30,  # More chunks
             persist_dir=persist_dir,
             max_context_chars=20000  # More content
-        )
-        
-        print(f"✓ Retrieved {len(context)} characters of context")
-        print(f"  📄 Context preview (first 500 chars): {context[:500]}...\n")
-        
-        # ====================================================================
-        # STEP 3: ANALYZE SECTOR
-        # ====================================================================
-        print(f"{'='*60}")
-        print(f"🔍 STEP 3: Analyzing repository sector")
-        print(f"{'='*60}")
-        
-        repo_name = body.repository_url.split('/')[-1].replace('-', ' ').replace('_', ' ').title()
-        
-        sector_data = await analyze_repository_sector(context, repo_name)
-        
-        primary_sector = sector_data["primary_sector"]
-        secondary_tech = sector_data["secondary_tech"]
-        description = sector_data["description"]
-        
-        print(f"✓ Sector analysis complete\n")
-        
-        # ====================================================================
-        # STEP 4: GENERATE MARKET ANALYSIS
-        # ====================================================================
-        print(f"{'='*60}")
-        print(f"📊 STEP 4: Generating market analysis")
-        print(f"{'='*60}")
-        print(f"  → Market analysis for {primary_sector} + {', '.join(secondary_tech)}")
-        
-        # Generate market analysis first
-        market_analysis = await generate_market_analysis(
-            project_description=primary_sector,
-            tech_stack=", ".join(secondary_tech) if secondary_tech else "Software",
-            target_audience=TARGET_AUDIENCES[body.audience_key]["label"]
-        )
-        
-        print(f"✓ Market analysis complete\n")
-        
-        # ====================================================================
-        # STEP 5: GENERATE PITCH DECK (with market data)
-        # ====================================================================
-        print(f"{'='*60}")
-        print(f"📝 STEP 5: Generating pitch deck structure")
-        print(f"{'='*60}")
-        print(f"  → Pitch deck for {TARGET_AUDIENCES[body.audience_key]['label']}")
-        print(f"  → Including market data: ${market_analysis.get('market_size', {}).get('value', 'N/A')}")
-        
-        # Generate pitch deck with market analysis data
-        pitch_deck_structure = await generate_pitch_deck_structure(
-            context=context,
-            audience_key=body.audience_key,
-            repo_url=body.repository_url,
-            market_analysis=market_analysis  # Now has actual data!
-        )
-        
-        print(f"✓ Pitch deck generation complete\n")
-        
-        # ====================================================================
-        # STEP 6: CREATE FILES
-        # ====================================================================
-        print(f"{'='*60}")
-        print(f"📄 STEP 6: Creating PowerPoint and script")
-        print(f"{'='*60}")
-        
-        # Create temp directory for outputs (matches old code)
-        temp_dir = Path("temp_pitch_decks")
-        temp_dir.mkdir(exist_ok=True)
+        ))
+    
+    if body.use_cache and is_index_fresh(persist_dir, INDEX_TTL_SECONDS, commit_sha):
+        # Current HEAD indexed recently: skip clone + index entirely
+        logger.info("step=index_skipped reason=fresh persist_dir=%s", persist_dir)
+        context_task = start_retrieval()
+    else:
+        # Clone and index (blocking git/embedding work runs off the event loop)
+        repo_data = await asyncio.to_thread(get_repo, body.repository_url)
+        try:
+            await asyncio.to_thread(index_repo, repo_data, body.repository_url, persist_dir)
+            
+            # Retrieval only needs the vector DB, so start it right away and
+            # let it overlap with cleanup of the clone
+            context_task = start_retrieval()
+        finally:
+            await asyncio.to_thread(cleanup_repo, repo_data["repo_path"])
+    
+    logger.info("step=indexed repo_hash=%s", repo_hash)
+    yield "indexed", {}
+    
+    # ====================================================================
+    # STEP 2: RETRIEVE CONTEXT
+    # ====================================================================
+    # Inputs for the later steps don't depend on the context
+    repo_name = body.repository_url.split('/')[-1].replace('-', ' ').replace('_', ' ').title()
+    audience_label = audience_cfg["label"]
+    
+    context = await context_task
+    
+    logger.info("step=context_retrieved chars=%d", len(context))
+    logger.debug("context_preview=%.500s", context)
+    yield "context_retrieved", {"context_chars": len(context)}
+    
+    # ====================================================================
+    # STEP 3: ANALYZE SECTOR
+    # ====================================================================
+    sector_data = await analyze_repository_sector(context, repo_name, use_cache=body.use_cache)
+    
+    primary_sector = sector_data["primary_sector"]
+    secondary_tech = sector_data["secondary_tech"]
+    description = sector_data["description"]
+    
+    logger.info("step=sector_done primary_sector=%s secondary_tech=%s", primary_sector, secondary_tech)
+    yield "sector_done", {
+        "primary_sector": primary_sector,
+        "secondary_tech": secondary_tech,
+        "description": description
+    }
+    
+    # ====================================================================
+    # STEP 4 + 5: MARKET ANALYSIS AND PITCH DECK (concurrently)
+    # ====================================================================
+    # Start market analysis; the deck builds its prompt meanwhile and
+    # only awaits the market task when it needs the data
+    market_task = asyncio.create_task(generate_market_analysis(
+        project_description=primary_sector,
+        tech_stack=", ".join(secondary_tech) if secondary_tech else "Software",
+        target_audience=audience_label
+    ))
+    
+    deck_task = asyncio.create_task(generate_pitch_deck_structure(
+        context=context,
+        audience_key=body.audience_key,
+        repo_url=body.repository_url,
+        market_analysis=market_task,
+        use_cache=body.use_cache
+    ))
+    
+    try:
+        # The deck waits on the market data, so the market task always settles
+        # first. A market failure is tolerated (the deck falls back), a deck
+        # failure is not
+        try:
+            market_analysis = await market_task
+        except Exception as e:
+            logger.warning("step=market_failed error=%s", e)
+            market_analysis = {"error": str(e)}
         
-        # Create filename with repo hash (matches old code pattern)
-        filename = f"pitch_deck_{repo_hash}_{body.audience_key}.pptx"
-        pptx_path = temp_dir / filename
+        logger.info("step=market_done market_size=%s", market_analysis.get("market_size", {}).get("value", "N/A"))
+        yield "market_done", {"market_size": market_analysis.get("market_size")}
         
-        # Create PowerPoint
-        create_powerpoint(
+        pitch_deck_structure = await deck_task
+    finally:
+        # No-ops once both have settled; if the client went away (or the
+        # pipeline failed) they stop instead of making LLM calls for no one
+        market_task.cancel()
+        deck_task.cancel()
+    
+    logger.info("step=deck_done slides=%d", len(pitch_deck_structure.get("slides", [])))
+    yield "deck_done", {"slides": len(pitch_deck_structure.get("slides", []))}
+    
+    # ====================================================================
+    # STEP 6: CREATE FILES
+    # ====================================================================
+    # Create temp directory for outputs (matches old code)
+    PITCH_DECK_DIR.mkdir(exist_ok=True)
+    
+    # Create filename with repo hash (matches old code pattern)
+    filename = f"pitch_deck_{repo_hash}_{body.audience_key}.pptx"
+    pptx_path = PITCH_DECK_DIR / filename
+    
+    # Create PowerPoint
+    await asyncio.get_running_loop().run_in_executor(
+        _get_render_pool(),
+        create_powerpoint,
+        pitch_deck_structure,
+        str(pptx_path)
+    )
+    logger.info("step=pptx_ready path=%s", pptx_path)
+    yield "pptx_ready", {"download_url": f"/download-pitch-deck/{filename}"}
+    
+    # Generate script
+    script_filename = f"script_{repo_hash}_{body.audience_key}.txt"
+    script_path = PITCH_DECK_DIR / script_filename
+    script = generate_script(pitch_deck_structure)
+    async with aiofiles.open(script_path, "w") as f:
+        await f.write(script)
+    logger.info("step=script_ready path=%s", script_path)
+    
+    if cache_key:
+        cache_pitch_deck(
+            cache_key,
             pitch_deck_structure,
-            str(pptx_path)
+            filename,
+            script_filename,
+            PITCH_DECK_DIR
         )
-        print(f"  ✓ PowerPoint created: {pptx_path}")
-        
-        # Generate script
-        script_filename = f"script_{repo_hash}_{body.audience_key}.txt"
-        script_path = temp_dir / script_filename
-        script = generate_script(pitch_deck_structure)
-        script_path.write_text(script)
-        print(f"  ✓ Script created: {script_path}")
-        
-        print(f"\n{'='*60}")
-        print(f"✅ SUCCESS: Pitch deck generated!")
-        print(f"{'='*60}\n")
-        
-        # Return response with download URLs (matches old code format)
-        return {
-            "success": True,
-            "message": "Pitch deck generated successfully",
-            "format": "pptx",
-            "download_url": f"/download-pitch-deck/{filename}",
-            "script_url": f"/download-pitch-deck/{script_filename}",
-            "pitch_data": pitch_deck_structure,
-            "powerpoint_path": str(pptx_path),
-            "script_path": str(script_path)
-        }
-        
+    
+    yield "complete", _pitch_deck_result(pitch_deck_structure, filename, script_filename)
+
+
+# Pipelines currently running, keyed by (repository_url, audience_key), so
+# identical concurrent requests share one run instead of each cloning/indexing
+_INFLIGHT: Dict[Tuple[str, str], asyncio.Future] = {}
+
+
+async def _single_flight_pipeline(body: PitchDeckRequest) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Run the pitch deck pipeline, or wait on an identical one already running.
+    
+    Followers only receive the final ("complete", result) event. Requests with
+    use_cache disabled always run their own pipeline.
+    """
+    if not body.use_cache:
+        async for event in _pitch_deck_pipeline(body):
+            yield event
+        return
+    
+    key = (body.repository_url, body.audience_key)
+    
+    inflight = _INFLIGHT.get(key)
+    if inflight is not None:
+        logger.info("step=dedup repo=%s audience=%s", *key)
+        # Shield so a disconnecting follower can't cancel the shared run
+        yield "complete", await asyncio.shield(inflight)
+        return
+    
+    future = asyncio.get_running_loop().create_future()
+    _INFLIGHT[key] = future
+    try:
+        async for step, data in _pitch_deck_pipeline(body):
+            if step == "complete":
+                future.set_result(data)
+            yield step, data
     except Exception as e:
-        print(f"\n{'='*60}")
-        print(f"❌ ERROR: {str(e)}")
-        print(f"{'='*60}\n")
-        
-        return PitchDeckResponse(
-            success=False,
-            message="Failed to generate pitch deck",
-            error=str(e)
-        )
+        if not future.done():
+            future.set_exception(e)
+            # Mark retrieved: there may be no followers to consume it
+            future.exception()
+        raise
+    finally:
+        # Cancellation / early close: release followers with an ordinary error
+        # (not CancelledError, which their except Exception handlers would miss)
+        del _INFLIGHT[key]
+        if not future.done():
+            future.set_exception(RuntimeError("pitch deck pipeline was cancelled"))
+            future.exception()
+
 
+def _pitch_deck_error(e: Exception) -> PitchDeckResponse:
+    """Log a pipeline failure and build the error response."""
+    logger.error("step=failed error=%s", e, exc_info=e)
+    
+    return PitchDeckResponse(
+        success=False,
+        message="Failed to generate pitch deck",
+        error=str(e)
+    )
+
+
+@app.post("/generate-pitch-deck")
+async def generate_pitch_deck(body: PitchDeckRequest):
+    """Generate pitch deck from GitHub repository (single JSON response)."""
+    try:
+        # Drain the events so the pipeline finishes (and releases its
+        # single-flight slot) before responding
+        async for step, data in _single_flight_pipeline(body):
+            if step == "complete":
+                result = data
+    except Exception as e:
+        return _pitch_deck_error(e)
+    
+    return result
+
+
+@app.post("/generate-pitch-deck/stream")
+async def generate_pitch_deck_stream(body: PitchDeckRequest):
+    """
+    Generate pitch deck from GitHub repository as Server-Sent Events.
+    
+    Emits one event per completed stage (indexed, context_retrieved,
+    sector_done, market_done, deck_done, pptx_ready) and finishes with a
+    "complete" event carrying the download URLs, or an "error" event.
+    """
+    async def event_stream():
+        try:
+            async for step, data in _single_flight_pipeline(body):
+                yield f"data: {json.dumps({'step': step, **data})}\n\n"
+        except Exception as e:
+            error = _pitch_deck_error(e)
+            yield f"data: {json.dumps({'step': 'error', **error.model_dump()})}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 @app.get("/download-pitch-deck/{filename}")
-async def download_pitch_deck(filename: str):
+async def download_pitch_deck(filename: str, request: Request):
     """Download a generated pitch deck file (PowerPoint or script)."""
-    file_path = Path("temp_pitch_decks") / filename
+    file_path = PITCH_DECK_DIR / filename
     
-    if not file_path.exists():
-        return {"error": "File not found"}
+    # Only the generated decks and scripts are downloadable
+    if file_path.suffix not in _DOWNLOAD_MEDIA_TYPES:
+        raise HTTPException(status_code=404, detail="File not found")
     
-    # Determine media type based on extension
-    if filename.endswith('.pptx'):
-        media_type = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
-    elif filename.endswith('.txt'):
-        media_type = "text/plain"
-    else:
-        media_type = "application/octet-stream"
+    # One stat serves the existence check, the ETag and FileResponse itself
+    try:
+        stat_result = os.stat(file_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not S_ISREG(stat_result.st_mode):
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    # Files are regenerated under the same name, so the ETag tracks mtime/size
+    # and clients always revalidate (cheap 304 when unchanged)
+    etag = f'"{hashlib.md5(f"{filename}:{stat_result.st_mtime_ns}:{stat_result.st_size}".encode()).hexdigest()}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "public, no-cache"}
+    
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=cache_headers)
     
     return FileResponse(
         path=str(file_path),
         filename=filename,
-        media_type=media_type
+        media_type=_DOWNLOAD_MEDIA_TYPES.get(file_path.suffix, "application/octet-stream"),
+        headers=cache_headers,
+        stat_result=stat_result
     )
 
 
@@ -294,10 +556,12 @@ async def clear_cache():
     """Clear expired cache entries."""
     try:
         cleared_count = clear_expired_cache()
+        cleared_decks = clear_expired_pitch_decks(PITCH_DECK_DIR)
         return {
             "success": True,
             "cleared_entries": cleared_count,
-            "message": f"Cleared {cleared_count} expired cache entries"
+            "cleared_pitch_decks": cleared_decks,
+            "message": f"Cleared {cleared_count} expired cache entries and {cleared_decks} expired pitch decks"
         }
     except Exception as e:
         return {"error": str(e)}
@@ -1,6 +1,11 @@
 """Market analysis using Exa Search MCP server via Dedalus."""
+import asyncio
+import logging
+import os
+import re
 from typing import Dict, Any
-from dedalus_labs import AsyncDedalus, DedalusRunner
+import orjson
+from services.dedalus_client import get_dedalus_runner
 from .cache import (
     get_cached_market_analysis,
     cache_market_analysis,
@@ -8,60 +13,17 @@ from .cache import (
 )
 from .google_market_search import search_market_size
 
+logger = logging.getLogger(__name__)
 
-async def generate_market_analysis(
-    project_description: str,
-    tech_stack: str,
-    target_audience: str,
-    model: str = "openai/gpt-5-mini",
-    use_cache: bool = True,
-    cache_ttl_days: int = 7
-) -> Dict[str, Any]:
-    """
-    Generate market analysis using Exa Search MCP server.
-    Results are cached to avoid redundant API calls.
-    
-    Args:
-        project_description: Brief description of the project
-        tech_stack: Technologies used in the project
-        target_audience: Target audience label
-        model: Model to use for analysis
-        use_cache: Whether to use cached results (default: True)
-        cache_ttl_days: Cache time-to-live in days (default: 7)
-        
-    Returns:
-        Dictionary with market analysis data
-    """
-    # Check cache first
-    if use_cache:
-        cached_data = get_cached_market_analysis(
-            project_description,
-            tech_stack,
-            target_audience
-        )
-        if cached_data:
-            print(f"✓ Using cached market analysis (key: {get_cache_key(project_description, tech_stack, target_audience)[:8]}...)")
-            return cached_data
-    
-    print(f"⚡ Generating fresh market analysis...")
-    
-    # Step 1: Get market size data from Google search
-    print(f"  → Searching Google for market size data...")
-    market_size_data = await search_market_size(project_description, tech_stack)
-    
-    # Step 2: Get competitive intelligence from Exa
-    print(f"  → Querying Exa Search for competitive intelligence...")
-    client = AsyncDedalus()
-    runner = DedalusRunner(client)
-    
-    # Get audience-specific focus
-    from pitch_deck.generator import get_target_audience_config
-    audience_config = get_target_audience_config(target_audience.lower().replace(' ', '_').replace('/', '_'))
-    market_focus = audience_config.get('market_focus', 'competitive landscape and market opportunity')
-    competitor_angle = audience_config.get('competitor_angle', 'competitive advantages')
-    
-    # Build prompt that will leverage Exa Search MCP
-    prompt = f"""You are a market research analyst with access to Exa Search tools. Research the market for this project.
+# Bound concurrent Exa MCP sessions across requests (provider rate limits)
+_EXA_SEM = asyncio.Semaphore(int(os.getenv("EXA_MAX_CONCURRENCY", "4")))
+_EXA_TIMEOUT_SECONDS = float(os.getenv("EXA_TIMEOUT_SECONDS", "60"))
+
+# Characters that matter when matching braces in a JSON payload
+_JSON_TOKEN_RE = re.compile(r'[{}"\\]')
+
+# Exa research prompt; filled per call with str.format (JSON braces are doubled)
+_MARKET_PROMPT_TEMPLATE = """You are a market research analyst with access to Exa Search tools. Research the market for this project.
 
 Project to analyze:
 - Description: {project_description}
@@ -119,50 +81,149 @@ Important:
 - If data is not available, indicate "Data not available" rather than making up numbers
 - Return ONLY the JSON, no markdown formatting
 """
+
+
+def _extract_json(text: str) -> str:
+    """
+    Extract the first balanced JSON object from an LLM response.
     
-    try:
-        # Use Exa Search MCP
-        result = await runner.run(
-            input=prompt,
-            model=model,
-            mcp_servers=["windsor/exa-search-mcp"],
-            stream=False
+    Single forward pass that tracks brace depth and ignores braces inside
+    string literals, so markdown fences and surrounding prose are skipped
+    without a separate regex pass.
+    
+    Args:
+        text: Raw model output
+        
+    Returns:
+        JSON object text (first '{' to last '}' if unbalanced)
+    """
+    start = text.find('{')
+    if start == -1:
+        return text.strip()
+    
+    depth = 0
+    in_string = False
+    skip = -1
+    
+    for match in _JSON_TOKEN_RE.finditer(text, start):
+        pos = match.start()
+        if pos == skip:
+            continue
+        char = match.group()
+        
+        if in_string:
+            if char == '\\':
+                skip = pos + 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:pos + 1]
+    
+    # Unbalanced (e.g. truncated output): fall back to the outermost braces
+    end = text.rfind('}')
+    return text[start:end + 1] if end > start else text[start:]
+
+
+async def generate_market_analysis(
+    project_description: str,
+    tech_stack: str,
+    target_audience: str,
+    model: str = "openai/gpt-5-mini",
+    use_cache: bool = True,
+    cache_ttl_days: int = 7
+) -> Dict[str, Any]:
+    """
+    Generate market analysis using Exa Search MCP server.
+    Results are cached to avoid redundant API calls.
+    
+    Args:
+        project_description: Brief description of the project
+        tech_stack: Technologies used in the project
+        target_audience: Target audience label
+        model: Model to use for analysis
+        use_cache: Whether to use cached results (default: True)
+        cache_ttl_days: Cache time-to-live in days (default: 7)
+        
+    Returns:
+        Dictionary with market analysis data
+    """
+    # Check cache first; the key is computed once and reused for the write
+    cache_key = None
+    if use_cache:
+        cache_key = get_cache_key(project_description, tech_stack, target_audience)
+        cached = get_cached_market_analysis(
+            project_description,
+            tech_stack,
+            target_audience,
+            cache_key=cache_key
         )
+        if cached:
+            logger.info("using cached market analysis (key: %.8s...)", cache_key)
+            return cached.data
+    
+    logger.info("generating fresh market analysis")
+    
+    runner = get_dedalus_runner()
+    
+    # Get audience-specific focus
+    from pitch_deck.generator import get_target_audience_config_by_label
+    audience_config = get_target_audience_config_by_label(target_audience)
+    market_focus = audience_config.get('market_focus', 'competitive landscape and market opportunity')
+    competitor_angle = audience_config.get('competitor_angle', 'competitive advantages')
+    
+    # Build prompt that will leverage Exa Search MCP
+    prompt = _MARKET_PROMPT_TEMPLATE.format(
+        project_description=project_description,
+        tech_stack=tech_stack,
+        target_audience=target_audience,
+        market_focus=market_focus,
+        competitor_angle=competitor_angle
+    )
+    
+    try:
+        # Step 1: Get market size data from Google search. It doesn't depend on
+        # the Exa query, so it runs in the background while Exa is queried.
+        # Started inside the try so the finally below always reaps it
+        logger.debug("searching google for market size data")
+        market_size_task = asyncio.create_task(search_market_size(project_description, tech_stack))
+        
+        # Step 2: Get competitive intelligence from Exa
+        logger.debug("querying exa search for competitive intelligence")
+        async with _EXA_SEM:
+            result = await asyncio.wait_for(
+                runner.run(
+                    input=prompt,
+                    model=model,
+                    mcp_servers=["windsor/exa-search-mcp"],
+                    stream=False
+                ),
+                timeout=_EXA_TIMEOUT_SECONDS
+            )
         
         output = getattr(result, "final_output", "")
         
         if not output or not output.strip():
             raise ValueError("Empty response from Exa Search")
         
-        # Try to parse as JSON
-        import json
-        import re
-        
-        # Clean output - extract JSON from response
-        clean_output = output.strip()
-        
-        # Strategy 1: Extract from markdown code blocks
-        if '```' in clean_output:
-            json_match = re.search(r'```(?:json)?\s*\n(.*?)\n```', clean_output, re.DOTALL)
-            if json_match:
-                clean_output = json_match.group(1).strip()
+        # Extract JSON from response (handles markdown code blocks and prose)
+        clean_output = _extract_json(output)
         
-        # Strategy 2: Extract from first { to last }
-        if not clean_output.startswith('{'):
-            json_start = clean_output.find('{')
-            json_end = clean_output.rfind('}')
-            if json_start != -1 and json_end != -1 and json_end > json_start:
-                clean_output = clean_output[json_start:json_end+1]
-        
-        exa_data = json.loads(clean_output)
+        exa_data = orjson.loads(clean_output)
         
         # Merge Google market size data with Exa competitive intelligence
+        market_size_data = await market_size_task
         market_data = {
             "market_size": market_size_data,
             **exa_data
         }
         
-        print(f"✓ Market analysis complete (Google + Exa)")
+        logger.info("market analysis complete (google + exa)")
         
         # Cache the successful result
         if use_cache:
@@ -172,21 +233,25 @@ Important:
                     tech_stack,
                     target_audience,
                     market_data,
-                    ttl_days=cache_ttl_days
+                    ttl_days=cache_ttl_days,
+                    cache_key=cache_key
                 )
-                print(f"✓ Market analysis cached for {cache_ttl_days} days")
+                logger.debug("market analysis cached for %s days", cache_ttl_days)
             except Exception as cache_error:
-                print(f"Warning: Failed to cache market analysis: {cache_error}")
+                logger.warning("failed to cache market analysis: %s", cache_error)
         
         return market_data
         
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         # Exa Search failed, but we still have Google data
-        print(f"⚠️  Exa Search JSON Parse Error: {str(e)}")
-        print(f"   Raw output: {output[:200]}...")
-        print(f"✓ Continuing with Google market data only")
+        logger.warning(
+            "exa search json parse error: %s; continuing with google market data only",
+            e
+        )
+        logger.debug("raw output: %.200s...", output)
         
         # Return just the Google market size data
+        market_size_data = await market_size_task
         return {
             "market_size": market_size_data,
             "competitive_landscape": {
@@ -207,14 +272,14 @@ Important:
             "sources": []
         }
     except Exception as e:
-        print(f"⚠️  Exa Search Error: {str(e)}")
-        print(f"✓ Continuing with Google market data only")
-        import traceback
-        traceback.print_exc()
+        logger.exception("exa search error: %s", e)
         return {
             "error": str(e),
             "message": "Failed to generate market analysis"
         }
+    finally:
+        # No-op once the search has finished; otherwise it is no longer needed
+        market_size_task.cancel()
 
 
 def format_market_analysis_for_slide(market_data: Dict[str, Any]) -> str:
@@ -229,7 +294,7 @@ def format_market_analysis_for_slide(market_data: Dict[str, Any]) -> str:
     """
     if "error" in market_data:
         error_msg = market_data.get("error", "Unknown error")
-        print(f"⚠️  Formatting market analysis with error: {error_msg}")
+        logger.warning("formatting market analysis with error: %s", error_msg)
         return f"Market analysis data unavailable ({error_msg}). Please conduct manual research."
     
     content_parts = []
@@ -246,7 +311,7 @@ def format_market_analysis_for_slide(market_data: Dict[str, Any]) -> str:
             if growth and growth != 'N/A' and 'not found' not in growth.lower():
                 content_parts.append(f"• Growth Rate: {growth}")
         else:
-            print(f"⚠️  Market size data not available: {value}")
+            logger.info("market size data not available: %s", value)
     
     # Key Trends
     if "trends" in market_data and "current_trends" in market_data["trends"]:
@@ -272,7 +337,7 @@ def format_market_analysis_for_slide(market_data: Dict[str, Any]) -> str:
                 content_parts.append(f"  - {opp}")
     
     if not content_parts:
-        print("⚠️  No market analysis content available")
+        logger.warning("no market analysis content available")
         return "Market analysis in progress. Competitive intelligence and trends available from Exa Search."
     
     return "\n".join(content_parts)
@@ -1,10 +1,104 @@
 """Market analysis caching system using ChromaDB."""
-import json
 import hashlib
-from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
-from chromadb import Client
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+import orjson
+import zstandard
+from chromadb import Collection, PersistentClient
 from chromadb.config import Settings
+from chromadb.errors import ChromaError
+
+logger = logging.getLogger(__name__)
+
+# (client, collection) per persist_dir, so calls skip client/collection setup.
+# Shared by all threads; use a distinct persist_dir per independent cache.
+_CLIENT_CACHE: Dict[str, Tuple[PersistentClient, Collection]] = {}
+_CLIENT_LOCK = threading.Lock()
+
+
+
+@dataclass(frozen=True)
+class CachedAnalysis:
+    """A cache hit: the stored market data plus when it was cached/expires.
+    
+    data is shared with the in-process LRU, so treat it as read-only.
+    """
+    data: Dict[str, Any]
+    cached_at: int
+    expires_at: int
+    from_cache: bool = True
+
+
+# In-process LRU in front of Chroma: cache_key -> (expires_at_ts, cache hit)
+_LRU_MAX_ENTRIES = 256
+_LRU: "OrderedDict[str, Tuple[float, CachedAnalysis]]" = OrderedDict()
+_LRU_LOCK = threading.Lock()
+
+
+def _lru_get(cache_key: str) -> Optional[CachedAnalysis]:
+    """Return a fresh LRU entry (dropping it if expired), or None."""
+    with _LRU_LOCK:
+        entry = _LRU.get(cache_key)
+        if entry is None:
+            return None
+        if time.time() > entry[0]:
+            del _LRU[cache_key]
+            return None
+        _LRU.move_to_end(cache_key)
+        return entry[1]
+
+
+def _lru_put(cache_key: str, expires_at: float, cached: CachedAnalysis) -> None:
+    with _LRU_LOCK:
+        _LRU[cache_key] = (expires_at, cached)
+        _LRU.move_to_end(cache_key)
+        while len(_LRU) > _LRU_MAX_ENTRIES:
+            _LRU.popitem(last=False)
+
+
+def _lru_discard(cache_keys: List[str]) -> None:
+    with _LRU_LOCK:
+        for cache_key in cache_keys:
+            _LRU.pop(cache_key, None)
+
+
+def _lru_discard_expired(now_ts: float) -> None:
+    with _LRU_LOCK:
+        for cache_key in [k for k, (expires_at, _) in _LRU.items() if now_ts > expires_at]:
+            del _LRU[cache_key]
+
+
+# Entries carry their expiry day (UTC) so sweeps can drop whole days at once
+_SECONDS_PER_DAY = 86400
+
+# Payload bodies live in zstd blobs under <persist_dir>/market_payloads/<expiry_day>/;
+# the Chroma document only holds a pointer
+_PAYLOAD_DIR = "market_payloads"
+_ZSTD_LEVEL = 3
+
+# Inputs are bounded once so the key and the stored metadata agree
+_MAX_DESCRIPTION_CHARS = 500
+_MAX_TECH_STACK_CHARS = 200
+
+
+def _normalize(
+    project_description: str,
+    tech_stack: str,
+    target_audience: str
+) -> Tuple[str, str, str]:
+    """Truncate cache inputs to the lengths stored in metadata."""
+    return (
+        project_description[:_MAX_DESCRIPTION_CHARS],
+        tech_stack[:_MAX_TECH_STACK_CHARS],
+        target_audience
+    )
 
 
 def get_cache_key(project_description: str, tech_stack: str, target_audience: str) -> str:
@@ -17,13 +111,34 @@ def get_cache_key(project_description: str, tech_stack: str, target_audience: st
         target_audience: Target audience
         
     Returns:
-        MD5 hash as cache key
+        BLAKE2b-128 hash as cache key
     """
-    combined = f"{project_description}|{tech_stack}|{target_audience}"
-    return hashlib.md5(combined.encode()).hexdigest()
+    project_description, tech_stack, target_audience = _normalize(
+        project_description, tech_stack, target_audience
+    )
+    combined = f"{project_description}|{tech_stack}|{target_audience}".encode()
+    return hashlib.blake2b(combined, digest_size=16).hexdigest()
+
+
+def _payload_path(persist_dir: str, expiry_day: int, cache_key: str) -> Path:
+    return Path(persist_dir) / _PAYLOAD_DIR / str(expiry_day) / f"{cache_key}.json.zst"
+
 
+def _write_payload(path: Path, market_data: Dict[str, Any]) -> None:
+    """Atomically write market data as a zstd-compressed JSON blob."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Compressor objects are not thread-safe, so each write gets its own
+    blob = zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(orjson.dumps(market_data))
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(blob)
+    os.replace(tmp_path, path)
 
-def init_market_cache(persist_dir: str = ".vectordb") -> Client:
+
+def _read_payload(path: str) -> Dict[str, Any]:
+    return orjson.loads(zstandard.ZstdDecompressor().decompress(Path(path).read_bytes()))
+
+
+def init_market_cache(persist_dir: str = ".vectordb") -> Tuple[PersistentClient, Collection]:
     """
     Initialize the market analysis cache collection.
     
@@ -31,23 +146,44 @@ def init_market_cache(persist_dir: str = ".vectordb") -> Client:
         persist_dir: Directory for persistent storage
         
     Returns:
-        ChromaDB client
+        Tuple of (ChromaDB client, market analysis collection)
     """
-    client = Client(Settings(
-        persist_directory=persist_dir,
-        anonymized_telemetry=False
-    ))
+    # Persistent, so rows (and the payload blobs they point to) survive a
+    # restart; Client(Settings(persist_directory=...)) alone is in-memory
+    Path(persist_dir).mkdir(parents=True, exist_ok=True)
+    client = PersistentClient(
+        path=persist_dir,
+        settings=Settings(anonymized_telemetry=False)
+    )
     
-    # Get or create market_analysis collection
-    try:
-        collection = client.get_collection(name="market_analysis_cache")
-    except Exception:
-        collection = client.create_collection(
-            name="market_analysis_cache",
-            metadata={"description": "Cached market analysis results"}
-        )
+    # Get or create market_analysis collection in one call
+    collection = client.get_or_create_collection(
+        name="market_analysis_cache",
+        metadata={"description": "Cached market analysis results"}
+    )
     
-    return client
+    return client, collection
+
+
+def _get_collection(persist_dir: str = ".vectordb") -> Collection:
+    """
+    Get the market analysis cache collection, initializing it once per persist_dir.
+    
+    Args:
+        persist_dir: Directory for persistent storage
+        
+    Returns:
+        Cached ChromaDB collection handle
+    """
+    # Lock-free fast path; the lock only guards first-time initialization
+    entry = _CLIENT_CACHE.get(persist_dir)
+    if entry is None:
+        with _CLIENT_LOCK:
+            entry = _CLIENT_CACHE.get(persist_dir)
+            if entry is None:
+                entry = _CLIENT_CACHE[persist_dir] = init_market_cache(persist_dir)
+    
+    return entry[1]
 
 
 def cache_market_analysis(
@@ -56,8 +192,9 @@ def cache_market_analysis(
     target_audience: str,
     market_data: Dict[str, Any],
     persist_dir: str = ".vectordb",
-    ttl_days: int = 7
-) -> None:
+    ttl_days: int = 7,
+    cache_key: Optional[str] = None
+) -> str:
     """
     Cache market analysis results.
     
@@ -68,56 +205,104 @@ def cache_market_analysis(
         market_data: Market analysis data to cache
         persist_dir: Directory for persistent storage
         ttl_days: Time-to-live in days (default: 7)
+        cache_key: Precomputed key from get_cache_key (computed if omitted)
+        
+    Returns:
+        Cache key the entry was stored under
     """
-    client = init_market_cache(persist_dir)
-    collection = client.get_collection(name="market_analysis_cache")
+    inputs = _normalize(project_description, tech_stack, target_audience)
+    if cache_key is None:
+        cache_key = get_cache_key(*inputs)
     
-    cache_key = get_cache_key(project_description, tech_stack, target_audience)
+    _upsert_entries({cache_key: (inputs, market_data)}, persist_dir, ttl_days)
     
-    # Store metadata
-    metadata = {
-        "project_description": project_description[:500],  # Truncate for metadata
-        "tech_stack": tech_stack[:200],
-        "target_audience": target_audience,
-        "cached_at": datetime.now().isoformat(),
-        "expires_at": (datetime.now() + timedelta(days=ttl_days)).isoformat()
-    }
+    return cache_key
+
+
+def cache_market_analysis_many(
+    entries: List[Tuple[str, str, str, Dict[str, Any]]],
+    persist_dir: str = ".vectordb",
+    ttl_days: int = 7
+) -> None:
+    """
+    Cache several market analysis results in one write.
     
-    # Serialize market data as JSON string for document
-    document = json.dumps(market_data, indent=2)
+    Per-call ChromaDB overhead (transaction, WAL, index update) is paid once
+    for the whole batch; batches of roughly 100-250 entries work best.
     
-    # Check if already exists
-    try:
-        existing = collection.get(ids=[cache_key])
-        if existing and existing['ids']:
-            # Update existing
-            collection.update(
-                ids=[cache_key],
-                documents=[document],
-                metadatas=[metadata]
-            )
-        else:
-            # Add new
-            collection.add(
-                ids=[cache_key],
-                documents=[document],
-                metadatas=[metadata]
-            )
-    except Exception:
-        # Add new if get fails
-        collection.add(
-            ids=[cache_key],
-            documents=[document],
-            metadatas=[metadata]
-        )
+    Args:
+        entries: (project_description, tech_stack, target_audience, market_data) tuples
+        persist_dir: Directory for persistent storage
+        ttl_days: Time-to-live in days (default: 7)
+    """
+    if not entries:
+        return
+    
+    normalized = [
+        (_normalize(project_description, tech_stack, target_audience), market_data)
+        for project_description, tech_stack, target_audience, market_data in entries
+    ]
+    
+    # Key each entry once; a repeated key keeps its last value, since
+    # Chroma rejects duplicate IDs within one upsert
+    # (inputs are already bounded, so get_cache_key's own slice is a no-op)
+    by_key = {get_cache_key(*inputs): (inputs, market_data) for inputs, market_data in normalized}
+    
+    _upsert_entries(by_key, persist_dir, ttl_days)
+
+
+def _upsert_entries(
+    by_key: Dict[str, Tuple[Tuple[str, str, str], Dict[str, Any]]],
+    persist_dir: str,
+    ttl_days: int
+) -> None:
+    """Write cache_key -> (normalized inputs, market_data) entries in one upsert."""
+    collection = _get_collection(persist_dir)
+    
+    # One clock read for the whole batch
+    cached_at = int(time.time())
+    expires_at = cached_at + ttl_days * _SECONDS_PER_DAY
+    expiry_day = expires_at // _SECONDS_PER_DAY
+    
+    ids = list(by_key)
+    
+    # Bodies go to side blobs before their pointers become visible in Chroma
+    payload_paths = [_payload_path(persist_dir, expiry_day, cache_key) for cache_key in ids]
+    for path, (_, market_data) in zip(payload_paths, by_key.values()):
+        _write_payload(path, market_data)
+    
+    # The document is just the key, keeping Chroma rows and embeddings small
+    documents = ids
+    
+    metadatas = [
+        {
+            "project_description": project_description,
+            "tech_stack": tech_stack,
+            "target_audience": target_audience,
+            "cached_at": cached_at,
+            "expires_at": expires_at,
+            "expiry_day": expiry_day,
+            "payload_path": str(path)
+        }
+        for path, ((project_description, tech_stack, target_audience), _) in zip(payload_paths, by_key.values())
+    ]
+    
+    # Insert or replace in a single call
+    collection.upsert(
+        ids=ids,
+        documents=documents,
+        metadatas=metadatas
+    )
+    _lru_discard(ids)
 
 
 def get_cached_market_analysis(
     project_description: str,
     tech_stack: str,
     target_audience: str,
-    persist_dir: str = ".vectordb"
-) -> Optional[Dict[str, Any]]:
+    persist_dir: str = ".vectordb",
+    cache_key: Optional[str] = None
+) -> Optional[CachedAnalysis]:
     """
     Retrieve cached market analysis if available and not expired.
     
@@ -126,47 +311,51 @@ def get_cached_market_analysis(
         tech_stack: Technology stack
         target_audience: Target audience
         persist_dir: Directory for persistent storage
+        cache_key: Precomputed key from get_cache_key (computed if omitted)
         
     Returns:
-        Cached market data or None if not found/expired
+        CachedAnalysis (data plus cache timestamps) or None if not found/expired
     """
     try:
-        client = init_market_cache(persist_dir)
-        collection = client.get_collection(name="market_analysis_cache")
+        collection = _get_collection(persist_dir)
         
-        cache_key = get_cache_key(project_description, tech_stack, target_audience)
+        if cache_key is None:
+            cache_key = get_cache_key(project_description, tech_stack, target_audience)
         
-        # Retrieve from cache
-        result = collection.get(ids=[cache_key], include=["documents", "metadatas"])
+        # Hot keys are served from memory without I/O or JSON decoding
+        cached = _lru_get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Retrieve from cache; the freshness check runs inside Chroma so an
+        # expired entry comes back empty
+        result = collection.get(
+            ids=[cache_key],
+            where={"expires_at": {"$gt": int(time.time())}},
+            include=["metadatas"]
+        )
         
         if not result or not result['ids']:
             return None
         
-        # Check expiration
         metadata = result['metadatas'][0]
-        expires_at = datetime.fromisoformat(metadata['expires_at'])
         
-        if datetime.now() > expires_at:
-            # Cache expired, delete it
-            collection.delete(ids=[cache_key])
-            return None
+        # The blob is only read once the entry is known to be fresh
+        market_data = _read_payload(metadata['payload_path'])
         
-        # Parse and return cached data
-        document = result['documents'][0]
-        market_data = json.loads(document)
+        cached = CachedAnalysis(
+            data=market_data,
+            cached_at=metadata['cached_at'],
+            expires_at=metadata['expires_at']
+        )
         
-        # Add cache metadata to response
-        market_data['_cache_info'] = {
-            'cached_at': metadata['cached_at'],
-            'expires_at': metadata['expires_at'],
-            'from_cache': True
-        }
+        _lru_put(cache_key, metadata['expires_at'], cached)
         
-        return market_data
+        return cached
         
-    except Exception as e:
-        # If any error, return None (cache miss)
-        print(f"Cache retrieval error: {e}")
+    except (ChromaError, OSError, zstandard.ZstdError, orjson.JSONDecodeError, KeyError, ValueError) as e:
+        # Unreadable or malformed entry: treat as a cache miss
+        logger.debug("market cache miss: %s", e)
         return None
 
 
@@ -181,33 +370,47 @@ def clear_expired_cache(persist_dir: str = ".vectordb") -> int:
         Number of entries cleared
     """
     try:
-        client = init_market_cache(persist_dir)
-        collection = client.get_collection(name="market_analysis_cache")
+        collection = _get_collection(persist_dir)
         
-        # Get all entries
-        all_entries = collection.get(include=["metadatas"])
+        now_ts = int(time.time())
+        total_before = collection.count()
         
-        if not all_entries or not all_entries['ids']:
-            return 0
+        # Days that have fully passed are dropped in one delete, without
+        # shipping their IDs back
+        today = now_ts // _SECONDS_PER_DAY
+        collection.delete(where={"expiry_day": {"$lt": today}})
+        _remove_expired_payload_days(persist_dir, today)
         
-        expired_ids = []
-        now = datetime.now()
-        
-        for i, metadata in enumerate(all_entries['metadatas']):
-            expires_at = datetime.fromisoformat(metadata['expires_at'])
-            if now > expires_at:
-                expired_ids.append(all_entries['ids'][i])
+        # What remains expired is today's partition, so this ID fetch stays small
+        expired = collection.get(
+            where={"expires_at": {"$lt": now_ts}},
+            include=[]
+        )
+        expired_ids = expired['ids'] if expired else []
         
         if expired_ids:
             collection.delete(ids=expired_ids)
         
-        return len(expired_ids)
+        _lru_discard_expired(now_ts)
+        
+        return total_before - collection.count()
         
-    except Exception as e:
-        print(f"Cache cleanup error: {e}")
+    except ChromaError as e:
+        logger.warning("market cache cleanup failed: %s", e)
         return 0
 
 
+def _remove_expired_payload_days(persist_dir: str, today: int) -> None:
+    """Remove payload blob directories for expiry days before today."""
+    payload_root = Path(persist_dir) / _PAYLOAD_DIR
+    if not payload_root.is_dir():
+        return
+    
+    for day_dir in payload_root.iterdir():
+        if day_dir.name.isdigit() and int(day_dir.name) < today:
+            shutil.rmtree(day_dir, ignore_errors=True)
+
+
 def get_cache_stats(persist_dir: str = ".vectordb") -> Dict[str, Any]:
     """
     Get statistics about the market analysis cache.
@@ -219,27 +422,15 @@ def get_cache_stats(persist_dir: str = ".vectordb") -> Dict[str, Any]:
         Dictionary with cache statistics
     """
     try:
-        client = init_market_cache(persist_dir)
-        collection = client.get_collection(name="market_analysis_cache")
+        collection = _get_collection(persist_dir)
         
-        all_entries = collection.get(include=["metadatas"])
-        
-        if not all_entries or not all_entries['ids']:
-            return {
-                "total_entries": 0,
-                "expired_entries": 0,
-                "valid_entries": 0
-            }
-        
-        now = datetime.now()
-        expired_count = 0
-        
-        for metadata in all_entries['metadatas']:
-            expires_at = datetime.fromisoformat(metadata['expires_at'])
-            if now > expires_at:
-                expired_count += 1
-        
-        total = len(all_entries['ids'])
+        # Total comes from the count; expired rows are counted by ID only
+        total = collection.count()
+        expired = collection.get(
+            where={"expires_at": {"$lt": int(time.time())}},
+            include=[]
+        )
+        expired_count = len(expired['ids']) if expired else 0
         
         return {
             "total_entries": total,
@@ -247,7 +438,8 @@ def get_cache_stats(persist_dir: str = ".vectordb") -> Dict[str, Any]:
             "valid_entries": total - expired_count
         }
         
-    except Exception as e:
+    except ChromaError as e:
+        logger.warning("market cache stats failed: %s", e)
         return {
             "error": str(e),
             "total_entries": 0
@@ -1,18 +1,233 @@
 """Google search tool for market size data using Google Custom Search API."""
 import os
+import asyncio
+import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from multiprocessing import get_context
 import httpx
-from typing import Dict, Any, Optional
+from typing import Dict, Any, NamedTuple, Optional, Tuple
+from urllib.parse import quote_plus, urlsplit
 from bs4 import BeautifulSoup
 import re
 
 # Try to import playwright for dynamic content
 try:
     from playwright.async_api import async_playwright
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
     PLAYWRIGHT_AVAILABLE = True
 except ImportError:
     PLAYWRIGHT_AVAILABLE = False
 
+# Try to import selectolax for fast HTML-to-text (BeautifulSoup is the fallback)
+try:
+    from selectolax.parser import HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# Try to import pyahocorasick for a single-pass anchor scan of page text
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Try to import hyperscan for a single multi-pattern scan of page text
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
 
+
+# Primary sector mappings (industry vertical)
+_PRIMARY_SECTORS = {
+    'mental health': 'mental health',
+    'therapy': 'mental health',
+    'wellness': 'wellness',
+    'health': 'healthcare',
+    'healthcare': 'healthcare',
+    'medical': 'healthcare',
+    'fitness': 'fitness',
+    'education': 'education',
+    'learning': 'education',
+    'teaching': 'education',
+    'student': 'education',
+    'finance': 'finance',
+    'banking': 'banking',
+    'payment': 'payments',
+    'shopping': 'e-commerce',
+    'ecommerce': 'e-commerce',
+    'retail': 'retail',
+    'food': 'food delivery',
+    'restaurant': 'food',
+    'delivery': 'delivery',
+    'logistics': 'logistics',
+    'travel': 'travel',
+    'booking': 'booking',
+    'hotel': 'hospitality',
+    'social': 'social media',
+    'messaging': 'messaging',
+    'chat': 'messaging',
+    'productivity': 'productivity',
+    'collaboration': 'collaboration',
+    'workplace': 'workplace',
+    'code': 'software development',
+    'developer': 'developer tools',
+    'programming': 'software development',
+    'analytics': 'analytics',
+    'data': 'data',
+    'crm': 'CRM',
+    'sales': 'sales',
+    'marketing': 'marketing',
+    'hr': 'HR',
+    'recruitment': 'recruitment',
+    'hiring': 'recruitment',
+    'real estate': 'real estate',
+    'property': 'real estate',
+    'gaming': 'gaming',
+    'game': 'gaming',
+    'entertainment': 'entertainment',
+    'music': 'music',
+    'video': 'video',
+    'streaming': 'streaming',
+    'iot': 'IoT',
+    'blockchain': 'blockchain',
+    'crypto': 'cryptocurrency',
+    'nft': 'NFT',
+}
+
+# Technology/approach modifiers (how it's done)
+_TECH_MODIFIERS = {
+    'ai': 'AI-powered',
+    'artificial intelligence': 'AI-powered',
+    'ml': 'machine learning',
+    'machine learning': 'machine learning',
+    'automation': 'automation',
+    'saas': 'SaaS',
+    'cloud': 'cloud-based',
+    'mobile': 'mobile',
+    'web': 'web-based',
+    'platform': 'platform',
+    'marketplace': 'marketplace',
+}
+
+
+_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Shared client so page fetches and Google API calls reuse pooled connections
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client, creating it on first use.
+    
+    Created lazily rather than at import so it binds to the running event loop.
+    
+    Returns:
+        Shared httpx.AsyncClient (HTTP/2, pooled keep-alive connections)
+    """
+    global _http_client
+    
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            timeout=httpx.Timeout(5.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            headers={'User-Agent': _USER_AGENT}
+        )
+    
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client's connections (call on app shutdown)."""
+    global _http_client
+    
+    if _http_client is not None:
+        await _http_client.aclose()
+    
+    _http_client = None
+
+
+# Search terms for a sector combined with a technology family
+_SECTOR_COMBINATIONS = {
+    ('education', 'ai'): "AI in education edtech artificial intelligence learning platforms educational technology",
+    ('healthcare', 'ai'): "AI in healthcare digital health artificial intelligence medical technology",
+    ('finance', 'ai'): "AI in finance fintech artificial intelligence financial services",
+    ('mental health', 'ai'): "AI mental health digital therapy artificial intelligence wellness apps",
+    ('fitness', 'ai'): "AI fitness wellness artificial intelligence health tracking",
+    ('gaming', 'blockchain'): "blockchain gaming NFT gaming web3 games",
+    ('real estate', 'blockchain'): "blockchain real estate proptech tokenization",
+}
+
+# Modifiers that count as the "ai" family for _SECTOR_COMBINATIONS
+_AI_MODIFIERS = frozenset({'AI-powered', 'machine learning'})
+
+
+def _split_keywords(table: Dict[str, str]):
+    """
+    Split a keyword table into single-word and multi-word lookups.
+    
+    Entries keep their table position so matches can be ordered as in the table.
+    
+    Returns:
+        Tuple of ({word: (index, value)}, [(index, phrase, value)])
+    """
+    words = {}
+    phrases = []
+    for index, (keyword, value) in enumerate(table.items()):
+        if ' ' in keyword:
+            phrases.append((index, keyword, value))
+        else:
+            words[keyword] = (index, value)
+    return words, phrases
+
+
+_SECTOR_WORDS, _SECTOR_PHRASES = _split_keywords(_PRIMARY_SECTORS)
+_MODIFIER_WORDS, _MODIFIER_PHRASES = _split_keywords(_TECH_MODIFIERS)
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def _match_keywords(tokens, padded_text: str, words, phrases) -> list:
+    """
+    Match whole-word keywords (a trailing plural "s" is allowed) and phrases.
+    
+    Args:
+        tokens: Distinct lowercase words of the text
+        padded_text: The words joined by single spaces, with a space at each end
+        words: Single-word lookup from _split_keywords
+        phrases: Multi-word list from _split_keywords
+        
+    Returns:
+        Matched values, deduplicated, in table order
+    """
+    hits = {}
+    for token in tokens:
+        entry = words.get(token)
+        if entry is None and token.endswith('s'):
+            entry = words.get(token[:-1])
+        if entry is not None:
+            hits[entry[0]] = entry[1]
+    
+    for index, phrase, value in phrases:
+        if f" {phrase} " in padded_text:
+            hits[index] = value
+    
+    # Order by table position (not text position) so the primary
+    # sector/modifier is chosen by table priority
+    return list(dict.fromkeys(hits[i] for i in sorted(hits)))
+
+
+@lru_cache(maxsize=1024)
 def _extract_sector_keywords(project_description: str, tech_stack: str) -> str:
     """
     Extract market sector keywords from project description and tech stack.
@@ -26,97 +241,20 @@ def _extract_sector_keywords(project_description: str, tech_stack: str) -> str:
     Returns:
         Sector-focused search keywords (may combine multiple sectors)
     """
-    # Primary sector mappings (industry vertical)
-    primary_sectors = {
-        'mental health': 'mental health',
-        'therapy': 'mental health',
-        'wellness': 'wellness',
-        'health': 'healthcare',
-        'medical': 'healthcare',
-        'fitness': 'fitness',
-        'education': 'education',
-        'learning': 'education',
-        'teaching': 'education',
-        'student': 'education',
-        'finance': 'finance',
-        'banking': 'banking',
-        'payment': 'payments',
-        'shopping': 'e-commerce',
-        'ecommerce': 'e-commerce',
-        'retail': 'retail',
-        'food': 'food delivery',
-        'restaurant': 'food',
-        'delivery': 'delivery',
-        'logistics': 'logistics',
-        'travel': 'travel',
-        'booking': 'booking',
-        'hotel': 'hospitality',
-        'social': 'social media',
-        'messaging': 'messaging',
-        'chat': 'messaging',
-        'productivity': 'productivity',
-        'collaboration': 'collaboration',
-        'workplace': 'workplace',
-        'code': 'software development',
-        'developer': 'developer tools',
-        'programming': 'software development',
-        'analytics': 'analytics',
-        'data': 'data',
-        'crm': 'CRM',
-        'sales': 'sales',
-        'marketing': 'marketing',
-        'hr': 'HR',
-        'recruitment': 'recruitment',
-        'hiring': 'recruitment',
-        'real estate': 'real estate',
-        'property': 'real estate',
-        'gaming': 'gaming',
-        'game': 'gaming',
-        'entertainment': 'entertainment',
-        'music': 'music',
-        'video': 'video',
-        'streaming': 'streaming',
-        'iot': 'IoT',
-        'blockchain': 'blockchain',
-        'crypto': 'cryptocurrency',
-        'nft': 'NFT',
-    }
-    
-    # Technology/approach modifiers (how it's done)
-    tech_modifiers = {
-        'ai': 'AI-powered',
-        'artificial intelligence': 'AI-powered',
-        'ml': 'machine learning',
-        'machine learning': 'machine learning',
-        'automation': 'automation',
-        'saas': 'SaaS',
-        'cloud': 'cloud-based',
-        'mobile': 'mobile',
-        'web': 'web-based',
-        'platform': 'platform',
-        'marketplace': 'marketplace',
-    }
-    
     # Combine and lowercase
     combined = f"{project_description} {tech_stack}".lower()
     
+    # Tokenize once; keywords must match whole words, so "ai" no longer
+    # fires on "maintain" or "hr" on "three"
+    words = _WORD_RE.findall(combined)
+    tokens = set(words)
+    padded_text = f" {' '.join(words)} "
+    
     # Find all matching primary sectors
-    matched_sectors = []
-    for keyword, sector in primary_sectors.items():
-        if keyword in combined:
-            if sector not in matched_sectors:
-                matched_sectors.append(sector)
+    matched_sectors = _match_keywords(tokens, padded_text, _SECTOR_WORDS, _SECTOR_PHRASES)
     
     # Find all matching tech modifiers
-    matched_modifiers = []
-    for keyword, modifier in tech_modifiers.items():
-        if keyword in combined:
-            if modifier not in matched_modifiers:
-                matched_modifiers.append(modifier)
-    
-    # Debug logging
-    if matched_sectors or matched_modifiers:
-        print(f"  🔍 Sector Detection: sectors={matched_sectors}, modifiers={matched_modifiers}")
+    matched_modifiers = _match_keywords(tokens, padded_text, _MODIFIER_WORDS, _MODIFIER_PHRASES)
     
     # Build combined search query
     if matched_sectors and matched_modifiers:
@@ -125,22 +263,19 @@ def _extract_sector_keywords(project_description: str, tech_stack: str) -> str:
         modifier = matched_modifiers[0]
         
         # Handle special combinations - prioritize the PRIMARY sector
-        if 'education' in matched_sectors and any('AI' in m or 'machine learning' in m for m in matched_modifiers):
-            return "AI in education edtech artificial intelligence learning platforms educational technology"
-        elif 'healthcare' in matched_sectors and any('AI' in m or 'machine learning' in m for m in matched_modifiers):
-            return "AI in healthcare digital health artificial intelligence medical technology"
-        elif 'finance' in matched_sectors and any('AI' in m or 'machine learning' in m for m in matched_modifiers):
-            return "AI in finance fintech artificial intelligence financial services"
-        elif 'mental health' in matched_sectors and any('AI' in m or 'machine learning' in m for m in matched_modifiers):
-            return "AI mental health digital therapy artificial intelligence wellness apps"
-        elif 'fitness' in matched_sectors and any('AI' in m or 'machine learning' in m for m in matched_modifiers):
-            return "AI fitness wellness artificial intelligence health tracking"
-        elif 'gaming' in matched_sectors and 'blockchain' in matched_modifiers:
-            return "blockchain gaming NFT gaming web3 games"
-        elif 'real estate' in matched_sectors and 'blockchain' in matched_modifiers:
-            return "blockchain real estate proptech tokenization"
-        else:
-            return f"{modifier} {primary} technology market"
+        families = []
+        if any(m in _AI_MODIFIERS for m in matched_modifiers):
+            families.append('ai')
+        if 'blockchain' in matched_sectors or 'blockchain' in matched_modifiers:
+            families.append('blockchain')
+        
+        for sector in matched_sectors:
+            for family in families:
+                combination = _SECTOR_COMBINATIONS.get((sector, family))
+                if combination:
+                    return combination
+        
+        return f"{modifier} {primary} technology market"
     
     elif matched_sectors:
         # Just primary sector
@@ -205,6 +340,44 @@ def _extract_sector_keywords(project_description: str, tech_stack: str) -> str:
     return "software applications SaaS"
 
 
+# Long-lived Playwright browser, launched on first dynamic fetch
+_playwright = None
+_browser = None
+_BROWSER_LOCK = asyncio.Lock()
+
+
+async def _get_browser():
+    """
+    Get the shared headless Chromium browser, launching it on first use.
+    
+    Returns:
+        Connected Playwright Browser
+    """
+    global _playwright, _browser
+    
+    async with _BROWSER_LOCK:
+        if _browser is None or not _browser.is_connected():
+            if _playwright is None:
+                _playwright = await async_playwright().start()
+            _browser = await _playwright.chromium.launch(headless=True)
+    
+    return _browser
+
+
+async def close_browser() -> None:
+    """Close the shared browser and stop Playwright (call on app shutdown)."""
+    global _playwright, _browser
+    
+    async with _BROWSER_LOCK:
+        if _browser is not None:
+            await _browser.close()
+        if _playwright is not None:
+            await _playwright.stop()
+        
+        _browser = None
+        _playwright = None
+
+
 async def _fetch_dynamic_content(url: str, timeout: int = 10) -> str:
     """
     Fetch content from dynamic JavaScript-rendered pages using Playwright.
@@ -220,34 +393,130 @@ async def _fetch_dynamic_content(url: str, timeout: int = 10) -> str:
         return ""
     
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            )
+        browser = await _get_browser()
+        
+        # A fresh context per fetch keeps cookies/storage isolated
+        context = await browser.new_context(
+            user_agent=_USER_AGENT
+        )
+        try:
             page = await context.new_page()
             
-            # Navigate and wait for content
-            await page.goto(url, timeout=timeout * 1000, wait_until='networkidle')
-            
-            # Wait a bit for any lazy-loaded content
-            await page.wait_for_timeout(2000)
+            # Navigate, then wait only until enough text has rendered
+            await page.goto(url, timeout=timeout * 1000, wait_until='domcontentloaded')
+            try:
+                await page.wait_for_function(
+                    "document.body && document.body.innerText.length > 500",
+                    timeout=3000
+                )
+            except PlaywrightTimeoutError:
+                pass  # Take whatever text is there
             
             # Get text content
             content = await page.inner_text('body')
-            
-            await browser.close()
-            
-            # Clean up whitespace
-            text = ' '.join(content.split())
-            
-            return text[:5000]
-            
+        finally:
+            await context.close()
+        
+        # Clean up whitespace
+        text = ' '.join(content.split())
+        
+        return text[:5000]
+        
     except Exception as e:
-        print(f"⚠️  Playwright failed for {url}: {str(e)}")
+        logger.warning("playwright failed for %s: %s", url, e)
         return ""
 
 
+# Upper bound on raw HTML read per page. Report sites often spend their first
+# tens of KB on inline scripts, styles and navigation, so this is sized to
+# reach the body text; the kept text is capped after extraction instead
+_MAX_HTML_BYTES = 1024 * 1024
+
+
+# HTML-to-text is CPU-bound, so pages are parsed in worker processes rather
+# than holding the GIL against request handling. Created on first use and
+# spawned (not forked) so workers don't inherit the server's threads and locks
+_PARSE_POOL: ProcessPoolExecutor | None = None
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    global _PARSE_POOL
+    if _PARSE_POOL is None:
+        _PARSE_POOL = ProcessPoolExecutor(max_workers=2, mp_context=get_context("spawn"))
+    return _PARSE_POOL
+
+
+def shutdown_parse_pool() -> None:
+    """Stop the HTML parsing workers, if started (call on app shutdown)."""
+    if _PARSE_POOL is not None:
+        _PARSE_POOL.shutdown(wait=False, cancel_futures=True)
+
+
+def _parse_html_bytes(body: bytes, encoding: str) -> str:
+    """Decode a (possibly truncated) HTML body and extract its text; runs in _PARSE_POOL."""
+    return _html_to_text(body.decode(encoding, errors="replace"))
+
+
+def _html_to_text(html: str) -> str:
+    """
+    Extract visible text from an HTML page.
+    
+    Args:
+        html: Raw HTML
+        
+    Returns:
+        Whitespace-collapsed text, limited to the first 5000 chars
+    """
+    if SELECTOLAX_AVAILABLE:
+        tree = HTMLParser(html)
+        
+        # Remove script, style and page-chrome elements
+        for node in tree.css("script, style, nav, footer, header"):
+            node.decompose()
+        
+        text = tree.body.text(separator=' ') if tree.body else ""
+    else:
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        # Remove script and style elements
+        for script in soup(["script", "style", "nav", "footer", "header"]):
+            script.decompose()
+        
+        text = soup.get_text(separator=' ', strip=True)
+    
+    # Clean up whitespace
+    text = ' '.join(text.split())
+    
+    return text[:5000]  # Limit to first 5000 chars
+
+
+# Sites whose content is rendered client-side
+_DYN_DOMAINS = frozenset({
+    'linkedin.com', 'facebook.com', 'twitter.com', 'x.com', 'reddit.com',
+    'instagram.com', 'medium.com', 'substack.com',
+})
+
+# Sites that typically require authentication
+_AUTH_DOMAINS = frozenset({
+    'linkedin.com', 'facebook.com', 'twitter.com', 'x.com',
+    'instagram.com', 'reddit.com', 'medium.com',
+})
+
+
+def _host(url: str) -> str:
+    """Return the URL's lowercase hostname, or '' if it has none."""
+    try:
+        return urlsplit(url).hostname or ''
+    except ValueError:  # e.g. a malformed IPv6 literal
+        return ''
+
+
+def _on_domains(url: str, domains: frozenset) -> bool:
+    """Check whether the URL's host is one of domains or a subdomain of one."""
+    host = _host(url)
+    return host in domains or any(host.endswith('.' + domain) for domain in domains)
+
+
 async def _fetch_page_content(url: str, timeout: int = 5, use_dynamic: bool = False) -> str:
     """
     Fetch and extract text content from a web page.
@@ -261,52 +530,87 @@ async def _fetch_page_content(url: str, timeout: int = 5, use_dynamic: bool = Fa
         Extracted text content
     """
     # Check if URL is likely to have dynamic content
-    dynamic_domains = ['linkedin.com', 'facebook.com', 'twitter.com', 'x.com', 'reddit.com', 
-                       'instagram.com', 'medium.com', 'substack.com']
-    
-    is_dynamic = use_dynamic or any(domain in url.lower() for domain in dynamic_domains)
+    is_dynamic = use_dynamic or _on_domains(url, _DYN_DOMAINS)
     
     # Try Playwright first for dynamic sites
     if is_dynamic and PLAYWRIGHT_AVAILABLE:
-        print(f"    🎭 Using Playwright for dynamic content...")
+        logger.debug("using playwright for %s", url)
         content = await _fetch_dynamic_content(url, timeout)
         if content:
             return content
-        print(f"    ⚠️  Playwright failed, falling back to static scraping...")
+        logger.debug("playwright returned nothing for %s, falling back to static scraping", url)
     
     # Fallback to static scraping
     try:
-        async with httpx.AsyncClient(follow_redirects=True, timeout=timeout) as client:
-            response = await client.get(
-                url,
-                headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                }
-            )
-            
+        # Stream the body, stopping at _MAX_HTML_BYTES for oversized pages
+        async with _get_http_client().stream("GET", url, timeout=timeout) as response:
             if response.status_code != 200:
                 return ""
             
-            # Parse HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "footer", "header"]):
-                script.decompose()
-            
-            # Get text
-            text = soup.get_text(separator=' ', strip=True)
-            
-            # Clean up whitespace
-            text = ' '.join(text.split())
+            # Skip PDFs, images, etc.; a missing content type is treated as HTML
+            content_type = response.headers.get("content-type", "")
+            if content_type and "html" not in content_type:
+                return ""
             
-            return text[:5000]  # Limit to first 5000 chars
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) >= _MAX_HTML_BYTES:
+                    break
             
+            encoding = response.encoding or "utf-8"
+        
+        # Decode + parse + whitespace cleanup run in a worker process so
+        # concurrent pages don't serialize on the GIL
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_parse_pool(), _parse_html_bytes, bytes(body), encoding)
+        
     except Exception as e:
-        print(f"⚠️  Failed to fetch {url}: {str(e)}")
+        logger.warning("failed to fetch %s: %s", url, e)
         return ""
 
 
+# Caps page fetches in flight across all searches
+_FETCH_SEM = asyncio.Semaphore(5)
+
+
+class SearchItem(NamedTuple):
+    """One Google search result, unpacked from the API response once."""
+    title: str
+    link: str
+    snippet: str
+
+
+async def _fetch_page_bounded(index: int, item: SearchItem) -> Tuple[int, SearchItem, Any]:
+    """Fetch one search result's page under the fetch semaphore; errors are returned, not raised."""
+    async with _FETCH_SEM:
+        try:
+            result = await _fetch_page_content(item.link, timeout=3)  # Reduced timeout
+        except Exception as e:
+            result = e
+    return index, item, result
+
+
+# (sector_keywords, UTC date) -> search result, least recently used first.
+# Results are handed out without copying, so callers must not mutate them
+_SEARCH_CACHE_MAX_ENTRIES = 512
+_SEARCH_CACHE: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+_SEARCH_LOCKS: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+
+def _search_cache_get(cache_key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    result = _SEARCH_CACHE.get(cache_key)
+    if result is not None:
+        _SEARCH_CACHE.move_to_end(cache_key)
+    return result
+
+
+def _search_cache_put(cache_key: Tuple[str, str], result: Dict[str, Any]) -> None:
+    _SEARCH_CACHE[cache_key] = result
+    while len(_SEARCH_CACHE) > _SEARCH_CACHE_MAX_ENTRIES:
+        _SEARCH_CACHE.popitem(last=False)
+
+
 async def search_market_size(
     project_description: str,
     tech_stack: str
@@ -319,7 +623,8 @@ async def search_market_size(
         tech_stack: Technologies used in the project
         
     Returns:
-        Dictionary with market size information
+        Dictionary with market size information (shared with the search
+        cache, so treat it as read-only)
     """
     api_key = os.getenv("GOOGLE_API_KEY")
     search_engine_id = os.getenv("GOOGLE_SEARCH_ENGINE_ID")
@@ -339,165 +644,224 @@ async def search_market_size(
     # Construct search query focused on market sector
     # Extract key terms and focus on industry/sector
     sector_keywords = _extract_sector_keywords(project_description, tech_stack)
-    query = f"{sector_keywords} market size 2024 forecast growth rate industry report"
     
-    print(f"🔍 Google Search Query: {query}")
-    print(f"   (Searching for sector: {sector_keywords})")
-    print(f"🔑 Using API Key: {api_key[:20]}...")
-    print(f"🔑 Using Search Engine ID: {search_engine_id}")
+    # A sector's search result is reused for the rest of the (UTC) day
+    cache_key = (sector_keywords, datetime.now(timezone.utc).strftime("%Y-%m-%d"))
+    cached = _search_cache_get(cache_key)
+    if cached is not None:
+        logger.info("using cached market size search for sector: %s", sector_keywords)
+        return cached
     
+    # Concurrent searches for the same sector wait for one upstream call
+    lock = _SEARCH_LOCKS.get(cache_key)
+    created_lock = lock is None
+    if created_lock:
+        lock = _SEARCH_LOCKS[cache_key] = asyncio.Lock()
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://www.googleapis.com/customsearch/v1",
-                params={
-                    "key": api_key,
-                    "cx": search_engine_id,
-                    "q": query,
-                    "num": 5  # Get top 5 results
-                },
-                timeout=10.0
-            )
-            
-            print(f"📊 Google API Response Status: {response.status_code}")
-            
-            if response.status_code != 200:
-                error_detail = ""
-                try:
-                    error_data = response.json()
-                    error_detail = error_data.get("error", {}).get("message", "")
-                except:
-                    pass
-                
-                # If 403, likely API not enabled
-                if response.status_code == 403:
-                    return {
-                        "value": "Google Custom Search API not enabled",
-                        "growth_rate": "N/A",
-                        "forecast": "N/A",
-                        "sources": [],
-                        "error": "Enable Custom Search API in Google Cloud Console",
-                        "setup_url": "https://console.cloud.google.com/apis/library/customsearch.googleapis.com"
-                    }
-                
-                return {
-                    "value": f"Search failed (status {response.status_code})",
-                    "growth_rate": "N/A",
-                    "forecast": "N/A",
-                    "sources": [],
-                    "error": error_detail
-                }
+        async with lock:
+            cached = _search_cache_get(cache_key)
+            if cached is not None:
+                return cached
             
-            data = response.json()
-            items = data.get("items", [])
+            result = await _run_market_search(sector_keywords, api_key, search_engine_id)
             
-            print(f"📄 Found {len(items)} search results")
+            # Only searches that produced sources are worth reusing
+            if result.get("sources"):
+                _search_cache_put(cache_key, result)
+    finally:
+        # Only the request that created the lock drops it (also on
+        # cancellation), so a waiter finishing later can't remove a newer lock
+        if created_lock and _SEARCH_LOCKS.get(cache_key) is lock:
+            del _SEARCH_LOCKS[cache_key]
+    
+    return result
+
+
+# Only the query changes between searches, so the request URL is built from
+# a template instead of a params dict httpx has to encode on every call
+_GOOGLE_SEARCH_URL = (
+    "https://www.googleapis.com/customsearch/v1?key={key}&cx={cx}&num=5&q={q}"
+)
+
+
+async def _run_market_search(
+    sector_keywords: str,
+    api_key: str,
+    search_engine_id: str
+) -> Dict[str, Any]:
+    """
+    Query Google for a sector and extract market size data from the top results.
+    
+    Args:
+        sector_keywords: Sector-focused search keywords
+        api_key: Google API key
+        search_engine_id: Custom Search Engine ID
+        
+    Returns:
+        Dictionary with market size information
+    """
+    query = f"{sector_keywords} market size 2024 forecast growth rate industry report"
+    
+    logger.info("google search query: %s", query)
+    logger.debug("search engine id: %s", search_engine_id)
+    
+    try:
+        url = _GOOGLE_SEARCH_URL.format(
+            key=quote_plus(api_key),
+            cx=quote_plus(search_engine_id),
+            q=quote_plus(query)
+        )
+        response = await _get_http_client().get(url, timeout=10.0)
+        
+        logger.debug("google api response status: %s", response.status_code)
+        
+        if response.status_code != 200:
+            error_detail = ""
+            try:
+                error_data = response.json()
+                error_detail = error_data.get("error", {}).get("message", "")
+            except (ValueError, AttributeError) as e:
+                # Non-JSON (or unexpectedly shaped) error body
+                logger.debug("could not parse google api error body: %s", e)
             
-            if not items:
-                print("⚠️  No search results returned from Google")
+            # If 403, likely API not enabled
+            if response.status_code == 403:
                 return {
-                    "value": "No market data found",
+                    "value": "Google Custom Search API not enabled",
                     "growth_rate": "N/A",
                     "forecast": "N/A",
-                    "sources": []
+                    "sources": [],
+                    "error": "Enable Custom Search API in Google Cloud Console",
+                    "setup_url": "https://console.cloud.google.com/apis/library/customsearch.googleapis.com"
                 }
             
-            # Extract sources and fetch actual page content
-            sources = []
-            all_content = []
-            
-            print(f"🌐 Fetching content from top {len(items)} results...")
-            
-            # Filter out sites that typically require authentication
-            auth_domains = ['linkedin.com', 'facebook.com', 'twitter.com', 'x.com', 
-                           'instagram.com', 'reddit.com', 'medium.com']
-            
-            filtered_items = []
-            for item in items:
-                link = item.get("link", "")
-                # Skip auth-required sites for market research
-                if not any(domain in link.lower() for domain in auth_domains):
-                    filtered_items.append(item)
-            
-            # If we filtered everything, use original list
-            if not filtered_items:
-                filtered_items = items
-                print(f"  ⚠️  All results require auth, using anyway...")
-            else:
-                print(f"  ✓ Filtered to {len(filtered_items)} public sources")
-            
-            # Fetch pages in parallel for speed
-            import asyncio
-            
-            fetch_tasks = []
-            for i, item in enumerate(filtered_items[:3], 1):  # Only fetch top 3 to save time
-                title = item.get("title", "")
-                link = item.get("link", "")
-                snippet = item.get("snippet", "")
-                
-                print(f"  [{i}] Queuing: {link[:60]}...")
-                
-                # Create fetch task
-                fetch_tasks.append({
-                    'task': _fetch_page_content(link, timeout=3),  # Reduced timeout
-                    'title': title,
-                    'link': link,
-                    'snippet': snippet
-                })
-            
-            # Fetch all pages in parallel
-            print(f"  ⚡ Fetching {len(fetch_tasks)} pages in parallel...")
-            results = await asyncio.gather(*[t['task'] for t in fetch_tasks], return_exceptions=True)
-            
-            # Process results
-            for i, (result, task_info) in enumerate(zip(results, fetch_tasks), 1):
-                title = task_info['title']
-                link = task_info['link']
-                snippet = task_info['snippet']
+            return {
+                "value": f"Search failed (status {response.status_code})",
+                "growth_rate": "N/A",
+                "forecast": "N/A",
+                "sources": [],
+                "error": error_detail
+            }
+        
+        data = response.json()
+        items = data.get("items", [])
+        
+        logger.info("found %d search results", len(items))
+        
+        if not items:
+            logger.warning("no search results returned from google")
+            return {
+                "value": "No market data found",
+                "growth_rate": "N/A",
+                "forecast": "N/A",
+                "sources": []
+            }
+        
+        # Extract sources and fetch actual page content
+        sources = []
+        content_length = 0
+        
+        # Skip auth-required sites for market research
+        items = [
+            SearchItem(item.get("title", ""), item.get("link", ""), item.get("snippet", ""))
+            for item in items
+        ]
+        filtered_items = [item for item in items if not _on_domains(item.link, _AUTH_DOMAINS)]
+        
+        # If we filtered everything, use original list
+        if not filtered_items:
+            filtered_items = items
+            logger.debug("all results require auth, using them anyway")
+        else:
+            logger.debug("filtered to %d public sources", len(filtered_items))
+        
+        fetch_items = filtered_items[:3]  # Only fetch top 3 to save time
+        
+        # Fetch pages in parallel but scan them in search-rank order as soon
+        # as every higher-ranked page has landed, so fields always come from
+        # the best-ranked page that has them (whatever order fetches finish
+        # in) and the search can stop once every field has been found
+        page_results = [None] * len(fetch_items)
+        fetched = [False] * len(fetch_items)
+        next_rank = 0
+        found = [None, None, None]  # market value, growth rate, forecast
+        
+        fetch_tasks = [
+            asyncio.create_task(_fetch_page_bounded(i, item))
+            for i, item in enumerate(fetch_items)
+        ]
+        try:
+            for next_page in asyncio.as_completed(fetch_tasks):
+                index, item, result = await next_page
                 
                 if isinstance(result, Exception):
-                    print(f"  ⚠️  Error fetching {title[:40]}: {str(result)[:50]}")
-                    all_content.append(snippet)
+                    logger.warning("error fetching %s: %s", item.link, result)
                     page_content = ""
                 elif result:
-                    all_content.append(result)
-                    print(f"  ✓ [{i}] Got {len(result)} chars from {title[:40]}...")
+                    logger.debug("[%d] got %d chars from %s", index + 1, len(result), item.title)
                     page_content = result
                 else:
                     # Fallback to snippet if page fetch fails
-                    all_content.append(snippet)
-                    print(f"  ⚠️  [{i}] Using snippet for {title[:40]}...")
+                    logger.debug("[%d] using snippet for %s", index + 1, item.title)
                     page_content = ""
                 
-                sources.append({
-                    "title": title,
-                    "url": link,
-                    "snippet": snippet,
-                    "content_fetched": bool(page_content)
-                })
-            
-            # Combine all content for analysis
-            combined_text = " ".join(all_content)
-            
-            print(f"📝 Total content length: {len(combined_text)} characters")
-            print(f"📄 Sample: {combined_text[:200]}...")
-            
-            market_value = _extract_market_value(combined_text)
-            growth_rate = _extract_growth_rate(combined_text)
-            forecast = _extract_forecast(combined_text)
-            
-            print(f"💰 Extracted market value: {market_value}")
-            print(f"📈 Extracted growth rate: {growth_rate}")
-            print(f"🔮 Extracted forecast: {forecast}")
-            
-            return {
-                "value": market_value,
-                "growth_rate": growth_rate,
-                "forecast": forecast,
-                "sources": sources,
-                "content_length": len(combined_text)
-            }
-            
+                page_results[index] = page_content
+                fetched[index] = True
+                
+                # Fill any fields still missing from the pages now scannable
+                # in rank order
+                while next_rank < len(fetch_items) and fetched[next_rank] and not all(found):
+                    page_fields = _match_market_fields(
+                        page_results[next_rank] or fetch_items[next_rank].snippet,
+                        wanted=[field is None for field in found]
+                    )
+                    found = [current or new for current, new in zip(found, page_fields)]
+                    next_rank += 1
+                
+                if all(found):
+                    logger.debug("all market fields found, skipping remaining pages")
+                    break
+        finally:
+            for task in fetch_tasks:
+                task.cancel()
+        
+        # Keep content and sources in search-rank order; pages skipped by the
+        # early exit are still listed for attribution
+        for item, page_content in zip(fetch_items, page_results):
+            content_length += len(page_content or item.snippet)
+            sources.append({
+                "title": item.title,
+                "url": item.link,
+                "snippet": item.snippet,
+                "content_fetched": bool(page_content)
+            })
+        
+        # Pages were scanned one at a time above, so their text is never
+        # joined; the reported length still counts the single-space separators
+        content_length += max(len(fetch_items) - 1, 0)
+        
+        logger.debug("total content length: %d characters", content_length)
+        if logger.isEnabledFor(logging.DEBUG):
+            first_page = page_results[0] or fetch_items[0].snippet
+            logger.debug("sample: %s...", first_page[:200])
+        
+        market_value, growth_rate, forecast = (
+            value or default for value, default in zip(found, _EXTRACTOR_DEFAULTS)
+        )
+        
+        logger.info(
+            "extracted market value: %s, growth rate: %s, forecast: %s",
+            market_value, growth_rate, forecast
+        )
+        
+        return {
+            "value": market_value,
+            "growth_rate": growth_rate,
+            "forecast": forecast,
+            "sources": sources,
+            "content_length": content_length
+        }
+        
     except Exception as e:
         return {
             "value": f"Search error: {str(e)}",
@@ -527,66 +891,248 @@ async def _fallback_search(
     }
 
 
-def _extract_market_value(text: str) -> str:
-    """Extract market value from text snippets."""
-    import re
+def _compile_tiers(*tiers):
+    """
+    Fuse each tier of patterns into one alternation, compiled once at import.
     
-    # Look for patterns like "$X billion", "$X.X trillion", etc.
-    patterns = [
+    A single search per tier replaces one search per pattern. Within a tier
+    the earliest match in the text wins (ties go to the earlier pattern);
+    later tiers are only consulted when an earlier tier finds nothing.
+    """
+    return tuple(
+        re.compile("|".join(f"(?:{pattern})" for pattern in tier), re.IGNORECASE)
+        for tier in tiers
+    )
+
+
+# Gaps between a lead-in word and the figure are bounded ([^$]{0,200} before
+# a "$", .{0,200}? elsewhere) instead of .*?, so a page without the figure
+# can't make a lead-in pattern backtrack across the whole text
+
+# Patterns like "$X billion", "$X.X trillion", etc.; exact amounts are
+# preferred over amounts found after a "valued/worth/size/market" lead-in
+_MARKET_VALUE_TIERS = _compile_tiers(
+    (
         r'\$\s*[\d,]+\.?\d*\s*(?:billion|trillion|million|B|T|M)\b',
         r'(?:USD|US\$)\s*[\d,]+\.?\d*\s*(?:billion|trillion|million|B|T|M)\b',
         r'[\d,]+\.?\d*\s*(?:billion|trillion|million)\s*(?:dollars|USD|US\$)',
-        r'(?:valued|worth|size|market).*?\$\s*[\d,]+\.?\d*\s*(?:billion|trillion|million|B|T|M)',
-        r'(?:valued|worth|size|market).*?[\d,]+\.?\d*\s*(?:billion|trillion|million)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return match.group(0).strip()
-    
-    # If no match, return a generic message with sources available
-    return "See search results for market size estimates"
+    ),
+    (
+        r'(?:valued|worth|size|market)[^$]{0,200}\$\s*[\d,]+\.?\d*\s*(?:billion|trillion|million|B|T|M)',
+        r'(?:valued|worth|size|market).{0,200}?[\d,]+\.?\d*\s*(?:billion|trillion|million)',
+    ),
+)
 
-
-def _extract_growth_rate(text: str) -> str:
-    """Extract growth rate from text snippets."""
-    import re
-    
-    # Look for patterns like "X% CAGR", "growing at X%", etc.
-    patterns = [
+# Patterns like "X% CAGR", "growing at X%", etc.; tight phrasings first
+_GROWTH_RATE_TIERS = _compile_tiers(
+    (
         r'[\d.]+\s*%\s*CAGR',
         r'CAGR\s+of\s+[\d.]+\s*%',
-        r'compound\s+annual\s+growth\s+rate.*?[\d.]+\s*%',
         r'grow(?:ing|th|s)?\s+(?:at|by|of)\s+[\d.]+\s*%',
         r'[\d.]+\s*%\s+(?:annual|yearly)\s+growth',
-        r'growth\s+rate.*?[\d.]+\s*%',
-        r'[\d.]+\s*%.*?(?:growth|CAGR)',
+    ),
+    (
+        r'compound\s+annual\s+growth\s+rate.{0,200}?[\d.]+\s*%',
+        r'growth\s+rate.{0,200}?[\d.]+\s*%',
+        r'[\d.]+\s*%.{0,200}?(?:growth|CAGR)',
+    ),
+)
+
+# Future projections; a projection followed by its target year comes first
+_FORECAST_TIERS = _compile_tiers(
+    (
+        r'(?:by|reach|expected|projected|forecast)[^$]{0,200}\$\s*[\d,]+\.?\d*\s*(?:billion|trillion|million|B|T|M).{0,200}?(?:by|in)\s+\d{4}',
+    ),
+    (
+        r'(?:by|in)\s+\d{4}[^$]{0,200}\$\s*[\d,]+\.?\d*\s*(?:billion|trillion|million|B|T|M)',
+        r'\d{4}.{0,200}?(?:reach|expected|projected)[^$]{0,200}\$\s*[\d,]+\.?\d*\s*(?:billion|trillion|million|B|T|M)',
+        r'(?:reach|expected|projected).{0,200}?[\d,]+\.?\d*\s*(?:billion|trillion|million).{0,200}?\d{4}',
+    ),
+)
+
+
+_EXTRACTOR_TIERS = (_MARKET_VALUE_TIERS, _GROWTH_RATE_TIERS, _FORECAST_TIERS)
+
+# Reported when no page yields a match; sources are still returned
+_EXTRACTOR_DEFAULTS = (
+    "See search results for market size estimates",
+    "See search results for growth rate estimates",
+    "See search results for forecast estimates",
+)
+
+
+# Hyperscan can't track match starts through large bounded repeats, so the
+# database is built from the patterns with each bounded gap widened to an
+# unbounded one. Every real match is still a match of the widened pattern
+_BOUNDED_GAP_RE = re.compile(r'\{0,\d+\}')
+
+
+def _build_hyperscan_database():
+    """
+    Compile every extractor tier into one Hyperscan database.
+    
+    Pattern ids are positions in the flattened _EXTRACTOR_TIERS list.
+    
+    Returns:
+        Compiled database, or None if Hyperscan rejects a pattern
+    """
+    expressions = [
+        _BOUNDED_GAP_RE.sub('*', tier.pattern).encode()
+        for tiers in _EXTRACTOR_TIERS
+        for tier in tiers
     ]
+    database = hyperscan.Database()
+    try:
+        database.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST] * len(expressions)
+        )
+    except hyperscan.error as e:
+        logger.warning("hyperscan compile failed, using re for extraction: %s", e)
+        return None
+    return database
+
+
+_HYPERSCAN_DB = _build_hyperscan_database() if HYPERSCAN_AVAILABLE else None
+
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7f]')
+
+
+def _ascii_stand_in(match: re.Match) -> str:
+    """Map a non-ASCII character to an ASCII one re would treat alike."""
+    char = match.group()
+    lowered = char.lower()
+    if len(lowered) == 1 and lowered.isascii():
+        return lowered  # e.g. the Kelvin sign, which IGNORECASE folds to 'k'
+    if char.isspace():
+        return ' '
+    if char.isdecimal():
+        return '0'
+    if char.isalnum():
+        return 'x'
+    return '?'
+
+
+def _hyperscan_starts(text: str) -> Dict[int, int]:
+    """
+    Scan text once and return the leftmost match start (str index) per pattern id.
     
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return match.group(0).strip()
+    Hyperscan matches bytes, so non-ASCII characters are first swapped for
+    one ASCII character each: offsets stay str indices, and a non-breaking
+    space still counts as \\s the way it does for re.
+    """
+    if not text.isascii():
+        text = _NON_ASCII_RE.sub(_ascii_stand_in, text)
+    starts = {}
+    
+    def on_match(pattern_id, start, end, flags, context):
+        if start < starts.get(pattern_id, len(text)):
+            starts[pattern_id] = start
+    
+    _HYPERSCAN_DB.scan(text.encode(), match_event_handler=on_match)
+    return starts
+
+
+# Literal anchors for each field: every extractor pattern for a field
+# contains at least one of its anchors, so a page with none of them can
+# skip that field's regexes. Fields: 0 = market value, 1 = growth rate,
+# 2 = forecast.
+_FIELD_ANCHORS = {
+    '$': (0, 2),
+    'usd': (0,),
+    'billion': (0, 2),
+    'trillion': (0, 2),
+    'million': (0, 2),
+    '%': (1,),
+}
+
+
+def _build_anchor_automaton():
+    """Build one automaton over all field anchors."""
+    automaton = ahocorasick.Automaton()
+    for anchor, fields in _FIELD_ANCHORS.items():
+        automaton.add_word(anchor, fields)
+    automaton.make_automaton()
+    return automaton
+
+
+_ANCHOR_AUTOMATON = _build_anchor_automaton() if AHOCORASICK_AVAILABLE else None
+
+
+def _candidate_fields(text: str) -> list:
+    """Return, per field, whether the text contains any of its anchors."""
+    lowered = text.lower()
+    candidates = [False, False, False]
     
-    return "See search results for growth rate estimates"
+    if _ANCHOR_AUTOMATON is not None:
+        # One linear pass, stopping as soon as every field has an anchor
+        for _, fields in _ANCHOR_AUTOMATON.iter(lowered):
+            for field in fields:
+                candidates[field] = True
+            if all(candidates):
+                break
+    else:
+        for anchor, fields in _FIELD_ANCHORS.items():
+            if anchor in lowered:
+                for field in fields:
+                    candidates[field] = True
+    
+    return candidates
 
 
-def _extract_forecast(text: str) -> str:
-    """Extract market forecast from text snippets."""
-    import re
+def _match_market_fields(
+    text: str,
+    wanted=(True, True, True)
+) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Match (market value, growth rate, forecast) in text.
     
-    # Look for future projections
-    patterns = [
-        r'(?:by|reach|expected|projected|forecast).*?\$\s*[\d,]+\.?\d*\s*(?:billion|trillion|million|B|T|M).*?(?:by|in)\s+\d{4}',
-        r'(?:by|in)\s+\d{4}.*?\$\s*[\d,]+\.?\d*\s*(?:billion|trillion|million|B|T|M)',
-        r'\d{4}.*?(?:reach|expected|projected).*?\$\s*[\d,]+\.?\d*\s*(?:billion|trillion|million|B|T|M)',
-        r'(?:reach|expected|projected).*?[\d,]+\.?\d*\s*(?:billion|trillion|million).*?\d{4}',
-    ]
+    An anchor pass first rules out fields the text cannot match. With
+    Hyperscan available the remaining tiers are located in one pass; re
+    then confirms each chosen tier from its reported start, so the
+    returned span is the same one the re-only path would produce.
     
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    Args:
+        text: Page text to scan
+        wanted: Per-field flags; fields already found elsewhere can be skipped
+        
+    Returns:
+        Tuple of (market value, growth rate, forecast); None where nothing matched
+    """
+    candidates = [w and c for w, c in zip(wanted, _candidate_fields(text))]
+    if not any(candidates):
+        return None, None, None
+    
+    if _HYPERSCAN_DB is None:
+        return tuple(
+            _first_match(tiers, text) if candidate else None
+            for tiers, candidate in zip(_EXTRACTOR_TIERS, candidates)
+        )
+    
+    starts = _hyperscan_starts(text)
+    
+    fields = []
+    pattern_id = 0
+    for tiers, candidate in zip(_EXTRACTOR_TIERS, candidates):
+        found = None
+        for tier in tiers:
+            start = starts.get(pattern_id)
+            pattern_id += 1
+            if candidate and found is None and start is not None:
+                match = tier.search(text, start)
+                if match:
+                    found = match.group(0).strip()
+        fields.append(found)
+    
+    return tuple(fields)
+
+
+def _first_match(tiers, text: str) -> Optional[str]:
+    """Return the first match from the highest-priority tier that matches."""
+    for pattern in tiers:
+        match = pattern.search(text)
         if match:
             return match.group(0).strip()
-    
-    return "See search results for forecast estimates"
+    return None
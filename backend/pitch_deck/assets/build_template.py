@@ -0,0 +1,73 @@
+"""
+Build template.pptx, the styled base deck create_powerpoint fills in.
+
+The styling (backgrounds, title/body fonts and colours, bullet spacing) lives
+in the slide layouts, so generated slides inherit it instead of formatting
+every paragraph at request time. Re-run after changing the styles:
+
+    python -m pitch_deck.assets.build_template
+"""
+from pathlib import Path
+from lxml import etree
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.oxml.ns import qn
+from pptx.util import Inches
+
+TEMPLATE_PATH = Path(__file__).with_name("template.pptx")
+
+TITLE_BLUE = "1F4E79"  # Professional blue
+SUBTITLE_GRAY = "595959"
+BODY_GRAY = "333333"  # Dark gray for readability
+
+
+def _set_level1_style(placeholder, size_pt: int, color: str, bold: bool = False, space_before_pt: int = 0) -> None:
+    """Give a layout placeholder's first outline level a default run style."""
+    tx_body = placeholder._element.get_or_add_txBody()
+    lst_style = tx_body.find(qn("a:lstStyle"))
+    if lst_style is None:
+        lst_style = etree.SubElement(tx_body, qn("a:lstStyle"))
+        tx_body.insert(1, lst_style)  # lstStyle follows bodyPr
+    for child in list(lst_style):
+        lst_style.remove(child)
+
+    lvl1 = etree.SubElement(lst_style, qn("a:lvl1pPr"))
+    if space_before_pt:
+        spc_bef = etree.SubElement(lvl1, qn("a:spcBef"))
+        etree.SubElement(spc_bef, qn("a:spcPts"), val=str(space_before_pt * 100))
+
+    def_rpr = etree.SubElement(lvl1, qn("a:defRPr"), sz=str(size_pt * 100))
+    if bold:
+        def_rpr.set("b", "1")
+    fill = etree.SubElement(def_rpr, qn("a:solidFill"))
+    etree.SubElement(fill, qn("a:srgbClr"), val=color)
+
+
+def build_template(path: Path = TEMPLATE_PATH) -> Path:
+    """Write the styled template deck to path."""
+    prs = Presentation()
+    prs.slide_width = Inches(10)
+    prs.slide_height = Inches(7.5)
+
+    # Layout 0: title slide on a light blue background
+    title_layout = prs.slide_layouts[0]
+    fill = title_layout.background.fill
+    fill.solid()
+    fill.fore_color.rgb = RGBColor(240, 248, 255)
+    _set_level1_style(title_layout.placeholders[0], 44, TITLE_BLUE, bold=True)
+    _set_level1_style(title_layout.placeholders[1], 20, SUBTITLE_GRAY)
+
+    # Layout 1: title and bullets on white
+    content_layout = prs.slide_layouts[1]
+    fill = content_layout.background.fill
+    fill.solid()
+    fill.fore_color.rgb = RGBColor(255, 255, 255)
+    _set_level1_style(content_layout.placeholders[0], 32, TITLE_BLUE, bold=True)
+    _set_level1_style(content_layout.placeholders[1], 20, BODY_GRAY, space_before_pt=12)
+
+    prs.save(path)
+    return path
+
+
+if __name__ == "__main__":
+    print(f"Wrote {build_template()}")
@@ -0,0 +1,140 @@
+"""Disk cache for fully generated pitch decks, keyed by repo commit and audience."""
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, Any, Optional
+from datetime import datetime, timedelta
+
+
+def get_pitch_deck_cache_key(repo_hash: str, commit_sha: str, audience_key: str) -> str:
+    """
+    Generate a content-addressed cache key for a generated pitch deck.
+
+    Args:
+        repo_hash: Stable hash of the repository URL
+        commit_sha: Commit SHA the deck was generated from
+        audience_key: Target audience identifier
+
+    Returns:
+        SHA-256 hash as cache key
+    """
+    combined = f"{repo_hash}|{commit_sha}|{audience_key}"
+    return hashlib.sha256(combined.encode()).hexdigest()
+
+
+# Sidecars live in a subdirectory so the download route (one path segment
+# under output_dir) can't serve them
+_SIDECAR_DIR = ".cache"
+
+
+def _sidecar_path(cache_key: str, output_dir: Path) -> Path:
+    return Path(output_dir) / _SIDECAR_DIR / f"{cache_key}.json"
+
+
+def _file_signature(path: Path) -> list:
+    """Size and mtime of a generated file, to detect it being overwritten."""
+    stat_result = path.stat()
+    return [stat_result.st_size, stat_result.st_mtime_ns]
+
+
+def cache_pitch_deck(
+    cache_key: str,
+    pitch_data: Dict[str, Any],
+    pptx_filename: str,
+    script_filename: str,
+    output_dir: Path,
+    ttl_days: int = 7
+) -> None:
+    """
+    Record a generated pitch deck in a JSON sidecar under output_dir.
+
+    Args:
+        cache_key: Key from get_pitch_deck_cache_key
+        pitch_data: Generated pitch deck structure
+        pptx_filename: Name of the PowerPoint file in output_dir
+        script_filename: Name of the script file in output_dir
+        output_dir: Directory holding the generated files
+        ttl_days: Time-to-live in days (default: 7)
+    """
+    now = datetime.now()
+    entry = {
+        "pitch_data": pitch_data,
+        "pptx_filename": pptx_filename,
+        "script_filename": script_filename,
+        "file_signatures": {
+            filename: _file_signature(Path(output_dir) / filename)
+            for filename in (pptx_filename, script_filename)
+        },
+        "cached_at": now.isoformat(),
+        "expires_at": (now + timedelta(days=ttl_days)).isoformat()
+    }
+
+    sidecar = _sidecar_path(cache_key, output_dir)
+    sidecar.parent.mkdir(parents=True, exist_ok=True)
+    sidecar.write_text(json.dumps(entry))
+
+
+def get_cached_pitch_deck(cache_key: str, output_dir: Path) -> Optional[Dict[str, Any]]:
+    """
+    Retrieve a cached pitch deck if its sidecar and files exist and it has not expired.
+
+    Args:
+        cache_key: Key from get_pitch_deck_cache_key
+        output_dir: Directory holding the generated files
+
+    Returns:
+        Cache entry (pitch_data, pptx_filename, script_filename, ...) or None
+    """
+    sidecar = _sidecar_path(cache_key, output_dir)
+
+    try:
+        entry = json.loads(sidecar.read_text())
+    except (OSError, ValueError):
+        return None
+
+    if datetime.now() > datetime.fromisoformat(entry["expires_at"]):
+        sidecar.unlink(missing_ok=True)
+        return None
+
+    # Files are named per repo and audience, so a later run (newer commit or
+    # use_cache off) may have overwritten or removed them since
+    signatures = entry.get("file_signatures", {})
+    for filename in (entry["pptx_filename"], entry["script_filename"]):
+        try:
+            if _file_signature(Path(output_dir) / filename) != signatures.get(filename):
+                return None
+        except OSError:
+            return None
+
+    return entry
+
+
+def clear_expired_pitch_decks(output_dir: Path) -> int:
+    """
+    Remove expired pitch deck cache entries.
+
+    Args:
+        output_dir: Directory holding the generated files
+
+    Returns:
+        Number of entries cleared
+    """
+    sidecar_dir = Path(output_dir) / _SIDECAR_DIR
+    if not sidecar_dir.is_dir():
+        return 0
+
+    now = datetime.now()
+    cleared = 0
+
+    for sidecar in sidecar_dir.glob("*.json"):
+        try:
+            entry = json.loads(sidecar.read_text())
+            expired = now > datetime.fromisoformat(entry["expires_at"])
+        except (OSError, ValueError, KeyError):
+            continue
+
+        if expired:
+            sidecar.unlink(missing_ok=True)
+            cleared += 1
+
+    return cleared
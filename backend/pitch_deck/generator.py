@@ -1,160 +1,214 @@
 """Pitch deck and script generation from repository analysis."""
-from typing import Dict, Any, List
+import io
+import re
+import threading
+import types
+import zipfile
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from typing import Dict, Any, List, Tuple
 from pptx import Presentation
-from pptx.util import Inches, Pt
-from pptx.enum.text import PP_ALIGN
+import pptx.opc.serialized as _pptx_serialized
 from pathlib import Path
-import json
+from xml.sax.saxutils import escape as _xml_escape
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
 
 
-# Predefined target audiences with specific focus areas
+# Decks are generated per request and downloaded once, so favour save speed
+# over size: deflate level 1 is several times faster than the default (6) for
+# ~10% larger files. python-pptx builds its ZipFile internally, so while one
+# of our saves runs its serializer sees a zipfile module whose ZipFile
+# defaults to this level.
+PPTX_COMPRESSLEVEL = 1
+
+_fast_zipfile = types.ModuleType("zipfile")
+_fast_zipfile.__dict__.update(zipfile.__dict__)
+_fast_zipfile.ZipFile = partial(zipfile.ZipFile, compresslevel=PPTX_COMPRESSLEVEL)
+_FAST_ZIP_LOCK = threading.Lock()
+
+
+@contextmanager
+def _fast_zip():
+    """Swap in the fast-deflate zipfile module for python-pptx's serializer."""
+    with _FAST_ZIP_LOCK:
+        _pptx_serialized.zipfile = _fast_zipfile
+        try:
+            yield
+        finally:
+            _pptx_serialized.zipfile = zipfile
+
+
+# Styled base deck, read once; each deck is opened from these bytes
+_TEMPLATE_BYTES = (Path(__file__).parent / "assets" / "template.pptx").read_bytes()
+
+# Leading bullet markers (and the whitespace around them) the LLM may include
+_BULLET_RE = re.compile(r'^[\s\u2022\-*]+')
+
+# Same handling as python-pptx's paragraph text setter: newlines become line
+# breaks and other control characters, invalid in XML, are escaped
+_LINE_BREAK_RE = re.compile("\n|\v")
+_CTRL_CHAR_RE = re.compile(r"([\x00-\x08\x0B-\x1F])")
+
+
+def _paragraph_xml(text: str) -> str:
+    """Render one line of slide text as an <a:p> element."""
+    runs = []
+    for idx, run_text in enumerate(_LINE_BREAK_RE.split(text)):
+        if idx:
+            runs.append("<a:br/>")
+        if run_text:
+            run_text = _CTRL_CHAR_RE.sub(lambda m: "_x%04X_" % ord(m.group(1)), run_text)
+            runs.append(f"<a:r><a:t>{_xml_escape(run_text)}</a:t></a:r>")
+    return f"<a:p>{''.join(runs)}</a:p>"
+
+
+def _set_paragraphs(text_frame, lines: List[str]) -> None:
+    """
+    Replace a text frame's paragraphs with one per line.
+    
+    The paragraphs are parsed from a single XML string instead of being added
+    and filled one python-pptx call at a time.
+    """
+    text_frame.clear()
+    if not lines:
+        return
+    
+    tx_body = text_frame._txBody
+    for p in tx_body.p_lst:
+        tx_body.remove(p)
+    
+    parsed = parse_xml(f"<a:txBody {nsdecls('a')}>{''.join(map(_paragraph_xml, lines))}</a:txBody>")
+    tx_body.extend(parsed)
+
+
+# Predefined target audiences with specific focus areas and the extra
+# requirements their pitch deck prompt asks for
 TARGET_AUDIENCES = {
     "seed_investors": {
         "label": "Seed Stage Investors",
         "focus": "problem-solution fit, market opportunity, founding team, early traction, funding ask",
-        "tone": "compelling, data-driven, visionary"
+        "tone": "compelling, data-driven, visionary",
+        "market_focus": "market size, growth potential, timing, competitive landscape gaps",
+        "competitor_angle": "market positioning, unique approach, competitive moats",
+        "requirements": """
+- Focus on market timing and opportunity gaps
+- Highlight unique approach vs existing solutions
+- Show early traction or validation
+- Emphasize competitive moats and defensibility
+- Demonstrate market positioning strategy
+- Compare market opportunity vs alternatives"""
     },
     "series_a_investors": {
         "label": "Series A Investors",
         "focus": "product-market fit, growth metrics, unit economics, competitive advantage, scaling strategy",
-        "tone": "metrics-focused, strategic, proven"
+        "tone": "metrics-focused, strategic, proven",
+        "market_focus": "market share potential, growth metrics, competitive advantages, barriers to entry",
+        "competitor_angle": "market leadership potential, sustainable advantages, winner-take-most dynamics",
+        "requirements": """
+- Focus on sustainable competitive advantages
+- Highlight growth metrics and market share potential
+- Show barriers to entry and network effects
+- Emphasize winner-take-most dynamics
+- Demonstrate path to market leadership
+- Compare competitive positioning vs alternatives"""
     },
     "enterprise_buyers": {
         "label": "Enterprise Buyers",
         "focus": "ROI, security, integration, support, compliance, case studies",
-        "tone": "professional, trustworthy, technical"
+        "tone": "professional, trustworthy, technical",
+        "market_focus": "enterprise readiness, compliance, security, vendor stability",
+        "competitor_angle": "enterprise features, support quality, compliance certifications",
+        "requirements": """
+- Focus on enterprise readiness and compliance
+- Highlight security, support, and SLAs
+- Show ROI and total cost of ownership
+- Emphasize vendor stability and long-term support
+- Demonstrate enterprise features vs competitors
+- Compare compliance certifications vs alternatives"""
     },
     "technical_team": {
         "label": "Technical Team / Engineers",
         "focus": "architecture, tech stack, scalability, code quality, developer experience, documentation",
         "tone": "technical, detailed, pragmatic",
         "market_focus": "competitive differentiation, technical advantages, developer ecosystem, integration capabilities",
-        "competitor_angle": "technical superiority, performance benchmarks, developer experience comparison"
+        "competitor_angle": "technical superiority, performance benchmarks, developer experience comparison",
+        "requirements": """
+- Focus on WHY this tool stands out from competitors technically
+- Highlight performance benchmarks, architecture advantages, code quality
+- Emphasize developer experience improvements over alternatives
+- Show technical differentiators (better APIs, cleaner architecture, faster performance)
+- Compare integration complexity vs competitors
+- Demonstrate technical superiority with concrete examples"""
     },
     "product_managers": {
         "label": "Product Managers",
         "focus": "features, roadmap, user experience, market fit, competitive analysis",
         "tone": "strategic, user-focused, analytical",
         "market_focus": "ease of integration, time-to-value, user adoption, feature parity",
-        "competitor_angle": "feature comparison, integration ease, user experience advantages"
+        "competitor_angle": "feature comparison, integration ease, user experience advantages",
+        "requirements": """
+- Focus on ease of integration within existing systems
+- Highlight time-to-value and quick wins
+- Show feature parity or advantages over competitors
+- Emphasize user adoption metrics and UX improvements
+- Demonstrate how it fits into current workflows
+- Compare integration effort vs competitors"""
     },
     "general_audience": {
         "label": "General Audience",
         "focus": "what it does, why it matters, key benefits, use cases",
         "tone": "accessible, clear, engaging",
         "market_focus": "everyday use cases, practical benefits, accessibility, value proposition",
-        "competitor_angle": "simplicity, usability, real-world benefits"
-    },
-    "seed_investors": {
-        "label": "Seed Stage Investors",
-        "focus": "problem-solution fit, market opportunity, founding team, early traction, funding ask",
-        "tone": "compelling, data-driven, visionary",
-        "market_focus": "market size, growth potential, timing, competitive landscape gaps",
-        "competitor_angle": "market positioning, unique approach, competitive moats"
-    },
-    "series_a_investors": {
-        "label": "Series A Investors",
-        "focus": "product-market fit, growth metrics, unit economics, competitive advantage, scaling strategy",
-        "tone": "metrics-focused, strategic, proven",
-        "market_focus": "market share potential, growth metrics, competitive advantages, barriers to entry",
-        "competitor_angle": "market leadership potential, sustainable advantages, winner-take-most dynamics"
-    },
-    "enterprise_buyers": {
-        "label": "Enterprise Buyers",
-        "focus": "ROI, security, integration, support, compliance, case studies",
-        "tone": "professional, trustworthy, technical",
-        "market_focus": "enterprise readiness, compliance, security, vendor stability",
-        "competitor_angle": "enterprise features, support quality, compliance certifications"
+        "competitor_angle": "simplicity, usability, real-world benefits",
+        "requirements": """
+- Focus on practical everyday use cases
+- Explain how it makes life easier in simple terms
+- Show real-world benefits anyone can understand
+- Emphasize simplicity and accessibility over competitors
+- Demonstrate value without technical jargon
+- Compare usability vs alternatives"""
     }
 }
 
 
+@lru_cache(maxsize=32)
 def get_target_audience_config(audience_key: str) -> Dict[str, str]:
     """Get configuration for a target audience."""
     return TARGET_AUDIENCES.get(audience_key, TARGET_AUDIENCES["general_audience"])
 
 
+@lru_cache(maxsize=32)
+def get_target_audience_config_by_label(label: str) -> Dict[str, str]:
+    """Get configuration for a target audience from its display label (or key)."""
+    for config in TARGET_AUDIENCES.values():
+        if config["label"] == label:
+            return config
+    return get_target_audience_config(label.lower().replace(' ', '_').replace('/', '_'))
+
+
 def _get_audience_specific_requirements(audience_key: str) -> str:
     """Get specific requirements for each audience type."""
-    requirements = {
-        "technical_team": """
-- Focus on WHY this tool stands out from competitors technically
-- Highlight performance benchmarks, architecture advantages, code quality
-- Emphasize developer experience improvements over alternatives
-- Show technical differentiators (better APIs, cleaner architecture, faster performance)
-- Compare integration complexity vs competitors
-- Demonstrate technical superiority with concrete examples""",
-        
-        "product_managers": """
-- Focus on ease of integration within existing systems
-- Highlight time-to-value and quick wins
-- Show feature parity or advantages over competitors
-- Emphasize user adoption metrics and UX improvements
-- Demonstrate how it fits into current workflows
-- Compare integration effort vs competitors""",
-        
-        "general_audience": """
-- Focus on practical everyday use cases
-- Explain how it makes life easier in simple terms
-- Show real-world benefits anyone can understand
-- Emphasize simplicity and accessibility over competitors
-- Demonstrate value without technical jargon
-- Compare usability vs alternatives""",
-        
-        "seed_investors": """
-- Focus on market timing and opportunity gaps
-- Highlight unique approach vs existing solutions
-- Show early traction or validation
-- Emphasize competitive moats and defensibility
-- Demonstrate market positioning strategy
-- Compare market opportunity vs alternatives""",
-        
-        "series_a_investors": """
-- Focus on sustainable competitive advantages
-- Highlight growth metrics and market share potential
-- Show barriers to entry and network effects
-- Emphasize winner-take-most dynamics
-- Demonstrate path to market leadership
-- Compare competitive positioning vs alternatives""",
-        
-        "enterprise_buyers": """
-- Focus on enterprise readiness and compliance
-- Highlight security, support, and SLAs
-- Show ROI and total cost of ownership
-- Emphasize vendor stability and long-term support
-- Demonstrate enterprise features vs competitors
-- Compare compliance certifications vs alternatives"""
-    }
-    
-    return requirements.get(audience_key, requirements["general_audience"])
+    return get_target_audience_config(audience_key)["requirements"]
 
 
-def build_pitch_deck_prompt(context: str, audience_key: str, repo_url: str) -> str:
-    """Build a structured prompt for pitch deck generation."""
-    audience_config = get_target_audience_config(audience_key)
-    
-    # Build audience-specific guidance
-    market_focus = audience_config.get('market_focus', 'market opportunity and competitive landscape')
-    competitor_angle = audience_config.get('competitor_angle', 'competitive advantages')
-    
-    return f"""You are an expert pitch deck creator and marketing strategist.
+# Instructions depend only on the audience and come first, so repeated
+# requests share an identical prompt prefix (LLM providers cache on exact
+# prefixes); the repo URL and context are appended after them
+_PROMPT_INSTRUCTIONS = """You are an expert pitch deck creator and marketing strategist.
 
 CRITICAL: Tailor this pitch deck specifically for the target audience!
 
-Target Audience: {audience_config['label']}
-Primary Focus: {audience_config['focus']}
-Tone: {audience_config['tone']}
+Target Audience: {label}
+Primary Focus: {focus}
+Tone: {tone}
 Market Analysis Focus: {market_focus}
 Competitive Positioning: {competitor_angle}
 
-Repository: {repo_url}
-
 AUDIENCE-SPECIFIC REQUIREMENTS:
-{_get_audience_specific_requirements(audience_key)}
+{requirements}
 
-Based on the following repository context, create a comprehensive pitch deck structure:
-
-{context}
+Based on the repository context given at the end of this prompt, create a comprehensive pitch deck structure.
 
 Generate a pitch deck with the following sections. Return ONLY valid JSON with this exact structure:
 
@@ -213,9 +267,9 @@ CRITICAL REQUIREMENTS:
 - Each slide MUST have AT LEAST 3 bullet points (preferably 4-5)
 - Content MUST be an array of strings, NOT a single string
 - Each bullet point should be informative and substantive (not just one word)
-- Tailor content specifically for {audience_config['label']}
-- Focus on: {audience_config['focus']}
-- Use {audience_config['tone']} tone
+- Tailor content specifically for {label}
+- Focus on: {focus}
+- Use {tone} tone
 - Make speaker notes detailed and actionable
 - Return ONLY the JSON, no markdown formatting or extra text
 
@@ -232,160 +286,152 @@ Example of BAD content format (DO NOT DO THIS):
 """
 
 
-def create_powerpoint(pitch_data: Dict[str, Any], output_path: str) -> str:
+_PROMPT_REPOSITORY = """
+Repository: {repo_url}
+
+Repository context:
+
+"""
+
+
+@lru_cache(maxsize=16)
+def _audience_instructions(audience_key: str) -> str:
+    """Fill the instruction template for an audience."""
+    audience_config = get_target_audience_config(audience_key)
+    fields = {
+        "label": audience_config["label"],
+        "focus": audience_config["focus"],
+        "tone": audience_config["tone"],
+        "market_focus": audience_config.get("market_focus", "market opportunity and competitive landscape"),
+        "competitor_angle": audience_config.get("competitor_angle", "competitive advantages"),
+        "requirements": audience_config["requirements"],
+    }
+    return _PROMPT_INSTRUCTIONS.format(**fields)
+
+
+def build_pitch_deck_prompt(context: str, audience_key: str, repo_url: str) -> Tuple[str, str]:
     """
-    Create a professional PowerPoint presentation from pitch deck data.
+    Build a structured prompt for pitch deck generation.
     
     Args:
-        pitch_data: Structured pitch deck data with title and slides
-        output_path: Path to save the .pptx file
+        context: Repository content from vector database
+        audience_key: Target audience identifier
+        repo_url: GitHub repository URL
         
     Returns:
-        Path to the created file
+        Tuple of (static_prefix, dynamic_suffix). The prefix is the same for
+        every request with this audience; append any further static
+        instructions to it before the suffix to keep the shared prefix long.
+    """
+    return (
+        _audience_instructions(audience_key),
+        _PROMPT_REPOSITORY.format(repo_url=repo_url) + context
+    )
+
+
+def build_pptx(pitch_data: Dict[str, Any]) -> Presentation:
     """
-    from pptx.util import Inches, Pt
-    from pptx.enum.text import PP_ALIGN
-    from pptx.dml.color import RGBColor
+    Build a PowerPoint presentation from pitch deck data, in memory.
     
-    prs = Presentation()
-    prs.slide_width = Inches(10)
-    prs.slide_height = Inches(7.5)
+    Styling comes from the template's slide layouts (see
+    assets/build_template.py); this only fills in the text.
+    
+    Args:
+        pitch_data: Structured pitch deck data with title and slides, each
+            slide's content a list of strings and speaker_notes a string
+    
+    Returns:
+        The unsaved presentation
+    """
+    prs = Presentation(io.BytesIO(_TEMPLATE_BYTES))
     
     # Title slide
     title_slide_layout = prs.slide_layouts[0]
     slide = prs.slides.add_slide(title_slide_layout)
-    title = slide.shapes.title
-    subtitle = slide.placeholders[1]
-    
-    # Style title slide
-    title.text = pitch_data.get("title", "Project Pitch Deck")
-    subtitle.text = "Generated from Repository Analysis"
-    
-    # Apply professional styling to title
-    title.text_frame.paragraphs[0].font.size = Pt(44)
-    title.text_frame.paragraphs[0].font.bold = True
-    title.text_frame.paragraphs[0].font.color.rgb = RGBColor(31, 78, 121)  # Professional blue
-    
-    subtitle.text_frame.paragraphs[0].font.size = Pt(20)
-    subtitle.text_frame.paragraphs[0].font.color.rgb = RGBColor(89, 89, 89)  # Gray
-    
-    # Add background color to title slide
-    background = slide.background
-    fill = background.fill
-    fill.solid()
-    fill.fore_color.rgb = RGBColor(240, 248, 255)  # Light blue background
+    slide.shapes.title.text = pitch_data.get("title", "Project Pitch Deck")
+    slide.placeholders[1].text = "Generated from Repository Analysis"
     
     # Content slides
+    bullet_slide_layout = prs.slide_layouts[1]
     for slide_data in pitch_data.get("slides", []):
-        # Use title and content layout
-        bullet_slide_layout = prs.slide_layouts[1]
         slide = prs.slides.add_slide(bullet_slide_layout)
-        
-        # Style title
-        title_shape = slide.shapes.title
-        title_shape.text = slide_data.get("title", "")
-        title_shape.text_frame.paragraphs[0].font.size = Pt(32)
-        title_shape.text_frame.paragraphs[0].font.bold = True
-        title_shape.text_frame.paragraphs[0].font.color.rgb = RGBColor(31, 78, 121)  # Professional blue
-        
-        # Add subtle background
-        background = slide.background
-        fill = background.fill
-        fill.solid()
-        fill.fore_color.rgb = RGBColor(255, 255, 255)  # White background
+        slide.shapes.title.text = slide_data.get("title", "")
         
         # Content
         content_shape = slide.placeholders[1]
-        text_frame = content_shape.text_frame
-        text_frame.clear()
         
-        content = slide_data.get("content", "")
+        lines = slide_data.get("content", [])
         
-        # Handle content as string or list
-        if isinstance(content, list):
-            lines = [str(item).strip() for item in content if str(item).strip()]
-        elif isinstance(content, str):
-            lines = [line.strip() for line in content.split('\n') if line.strip()]
-        else:
-            lines = [str(content)]
-        
-        for i, line in enumerate(lines):
-            if i == 0:
-                p = text_frame.paragraphs[0]
-            else:
-                p = text_frame.add_paragraph()
-            
-            # Remove bullet if already present
-            clean_line = line.lstrip('•-*').strip()
-            p.text = clean_line
-            p.level = 0
-            p.font.size = Pt(20)  # Larger, more readable
-            p.font.color.rgb = RGBColor(51, 51, 51)  # Dark gray for readability
-            p.space_before = Pt(12)  # Add spacing between bullets
+        # Remove bullet if already present
+        _set_paragraphs(content_shape.text_frame, [_BULLET_RE.sub('', line) for line in lines])
         
         # Add speaker notes
-        notes_slide = slide.notes_slide
-        text_frame = notes_slide.notes_text_frame
-        speaker_notes = slide_data.get("speaker_notes", "")
-        
-        # Handle speaker_notes as string or list
-        if isinstance(speaker_notes, list):
-            text_frame.text = "\n".join(str(item) for item in speaker_notes)
-        else:
-            text_frame.text = str(speaker_notes)
+        slide.notes_slide.notes_text_frame.text = slide_data.get("speaker_notes", "")
     
-    # Save
-    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    prs.save(output_path)
+    return prs
+
+
+def save_pptx(prs: Presentation, output_path: str) -> str:
+    """
+    Save a presentation to disk, creating its directory if needed.
+    
+    Args:
+        prs: Presentation from build_pptx
+        output_path: Path to save the .pptx file
     
+    Returns:
+        Path to the saved file
+    """
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with _fast_zip():
+        prs.save(output_path)
     return output_path
 
 
+def create_powerpoint(pitch_data: Dict[str, Any], output_path: str) -> str:
+    """
+    Create a professional PowerPoint presentation from pitch deck data.
+    
+    Args:
+        pitch_data: Structured pitch deck data with title and slides
+        output_path: Path to save the .pptx file
+    
+    Returns:
+        Path to the created file
+    """
+    return save_pptx(build_pptx(pitch_data), output_path)
+
+
 def generate_script(pitch_data: Dict[str, Any]) -> str:
     """
     Generate a presenter script from pitch deck data.
     
     Args:
-        pitch_data: Structured pitch deck data
+        pitch_data: Structured pitch deck data, normalized as for build_pptx
         
     Returns:
         Formatted script as markdown
     """
-    script_parts = [
-        f"# Presentation Script: {pitch_data.get('title', 'Pitch Deck')}",
-        "",
-        "---",
-        ""
-    ]
+    buf = io.StringIO()
+    write = buf.write
+    write(f"# Presentation Script: {pitch_data.get('title', 'Pitch Deck')}\n\n---\n")
     
     for i, slide_data in enumerate(pitch_data.get("slides", []), 1):
         slide_title = slide_data.get("title", f"Slide {i}")
-        content = slide_data.get("content", "")
+        content = slide_data.get("content", [])
         notes = slide_data.get("speaker_notes", "")
         
-        # Handle content as string or list
-        if isinstance(content, list):
-            content_str = "\n".join(f"- {item}" for item in content)
-        else:
-            content_str = str(content)
+        write(f"\n## Slide {i}: {slide_title}\n\n**On Screen:**\n")
+        
+        for j, item in enumerate(content):
+            if j:
+                write("\n")
+            write("- ")
+            write(item)
         
-        # Handle notes as string or list
-        if isinstance(notes, list):
-            notes_str = "\n".join(str(item) for item in notes)
-        else:
-            notes_str = str(notes)
+        write("\n\n**What to Say:**\n")
+        write(notes)
         
-        script_parts.extend([
-            f"## Slide {i}: {slide_title}",
-            "",
-            "**On Screen:**",
-            content_str,
-            "",
-            "**What to Say:**",
-            notes_str,
-            "",
-            "---",
-            ""
-        ])
+        write("\n\n---\n")
     
-    return "\n".join(script_parts)
+    return buf.getvalue()
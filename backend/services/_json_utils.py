@@ -0,0 +1,28 @@
+"""Helpers for pulling JSON out of free-form LLM responses."""
+import re
+
+_CODE_BLOCK_RE = re.compile(r'```(?:json)?\s*\n(.*?)\n```', re.DOTALL)
+
+
+def extract_json(response: str) -> str:
+    """Extract JSON from LLM response that may contain markdown or explanatory text."""
+    clean = response.strip()
+    
+    # Common case: the response is already a bare JSON object
+    if clean.startswith('{') and clean.endswith('}'):
+        return clean
+    
+    # Strategy 1: Extract from markdown code blocks
+    if '```' in clean:
+        json_match = _CODE_BLOCK_RE.search(clean)
+        if json_match:
+            clean = json_match.group(1).strip()
+    
+    # Strategy 2: Extract from first { to last }
+    if not clean.startswith('{'):
+        json_start = clean.find('{')
+        json_end = clean.rfind('}')
+        if json_start != -1 and json_end != -1 and json_end > json_start:
+            clean = clean[json_start:json_end+1]
+    
+    return clean
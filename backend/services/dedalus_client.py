@@ -0,0 +1,36 @@
+"""Shared Dedalus client so LLM calls reuse one connection pool."""
+from typing import Optional
+from dedalus_labs import AsyncDedalus, DedalusRunner
+
+_client: Optional[AsyncDedalus] = None
+_runner: Optional[DedalusRunner] = None
+
+
+def get_dedalus_runner() -> DedalusRunner:
+    """
+    Get the process-wide DedalusRunner, creating the client on first use.
+
+    Created lazily rather than at import so the API key from .env has been
+    loaded by the time the client reads it.
+
+    Returns:
+        Shared DedalusRunner instance
+    """
+    global _client, _runner
+
+    if _runner is None:
+        _client = AsyncDedalus()
+        _runner = DedalusRunner(_client)
+
+    return _runner
+
+
+async def close_dedalus_client() -> None:
+    """Close the shared client's connections (call on app shutdown)."""
+    global _client, _runner
+
+    if _client is not None:
+        await _client.close()
+
+    _client = None
+    _runner = None
@@ -0,0 +1,90 @@
+"""Disk cache for LLM responses, keyed by model and exact prompt."""
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import Optional
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# One JSON file per cached response
+LLM_CACHE_DIR = Path("llm_cache")
+
+
+def get_llm_cache_key(model: str, prompt: str) -> str:
+    """
+    Generate a cache key for an LLM call.
+
+    The whole prompt is hashed, so any change to the context, audience or
+    market data it embeds is a miss.
+
+    Args:
+        model: Model identifier the prompt is sent to
+        prompt: Full prompt text
+
+    Returns:
+        SHA-256 hash as cache key
+    """
+    return hashlib.sha256(f"{model}|{prompt}".encode()).hexdigest()
+
+
+def _entry_path(cache_key: str, cache_dir: Path) -> Path:
+    return Path(cache_dir) / f"{cache_key}.json"
+
+
+def get_cached_llm_output(cache_key: str, cache_dir: Path = LLM_CACHE_DIR) -> Optional[str]:
+    """
+    Retrieve a cached LLM response if it exists and has not expired.
+
+    Args:
+        cache_key: Key from get_llm_cache_key
+        cache_dir: Directory holding cached responses
+
+    Returns:
+        Cached response text or None
+    """
+    path = _entry_path(cache_key, cache_dir)
+
+    try:
+        entry = json.loads(path.read_text())
+        expires_at = datetime.fromisoformat(entry["expires_at"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+    if datetime.now() > expires_at:
+        path.unlink(missing_ok=True)
+        return None
+
+    return entry.get("output")
+
+
+def cache_llm_output(
+    cache_key: str,
+    output: str,
+    cache_dir: Path = LLM_CACHE_DIR,
+    ttl_days: int = 7
+) -> None:
+    """
+    Store an LLM response. Only call this once the response has been parsed
+    successfully, so a malformed answer is retried rather than replayed.
+
+    Args:
+        cache_key: Key from get_llm_cache_key
+        output: Response text
+        cache_dir: Directory holding cached responses
+        ttl_days: Time-to-live in days (default: 7)
+    """
+    now = datetime.now()
+    entry = {
+        "output": output,
+        "cached_at": now.isoformat(),
+        "expires_at": (now + timedelta(days=ttl_days)).isoformat()
+    }
+
+    path = _entry_path(cache_key, cache_dir)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(entry))
+    except OSError as e:
+        logger.warning("could not cache llm response: %s", e)
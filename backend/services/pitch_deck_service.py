@@ -1,15 +1,34 @@
 """Pitch deck generation service."""
-import json
-from typing import Dict, Any
-from dedalus_labs import AsyncDedalus, DedalusRunner
+import inspect
+import logging
+from collections import OrderedDict
+import orjson
+from typing import Dict, Any, Awaitable, Union
+from services.dedalus_client import get_dedalus_runner
 from pitch_deck.generator import build_pitch_deck_prompt
+from services._json_utils import extract_json
+from services.llm_cache import get_llm_cache_key, get_cached_llm_output, cache_llm_output
+
+logger = logging.getLogger(__name__)
+
+_PITCH_DECK_MODEL = "openai/gpt-4o-mini"
+
+# Appended to the static part of the prompt, ahead of the repository context
+_ACCURACY_NOTE = """
+CRITICAL INSTRUCTION: Use ONLY information from the repository context provided below.
+- Do NOT make up or assume technologies, features, or details
+- If the repository uses Weaviate, say Weaviate (not MongoDB)
+- If the repository uses specific libraries, mention those exact libraries
+- Base ALL content on the actual code, commits, and documentation provided
+"""
 
 
 async def generate_pitch_deck_structure(
     context: str,
     audience_key: str,
     repo_url: str,
-    market_analysis: Dict[str, Any]
+    market_analysis: Union[Dict[str, Any], Awaitable[Dict[str, Any]]],
+    use_cache: bool = True
 ) -> Dict[str, Any]:
     """
     Generate pitch deck structure using Dedalus AI.
@@ -18,64 +37,126 @@ async def generate_pitch_deck_structure(
         context: Repository content from vector database
         audience_key: Target audience identifier
         repo_url: GitHub repository URL
-        market_analysis: Market analysis data
+        market_analysis: Market analysis data, or an awaitable (task/future)
+            resolving to it. It is only awaited once the rest of the prompt
+            has been assembled.
+        use_cache: Reuse a stored LLM response for an identical prompt
         
     Returns:
         Dict with title and slides
     """
-    print(f"  📊 Generating pitch deck structure...")
+    logger.info("generating pitch deck structure audience=%s", audience_key)
     
     # Build prompt with audience-specific requirements
-    prompt = build_pitch_deck_prompt(context, audience_key, repo_url)
+    static_prefix, dynamic_suffix = build_pitch_deck_prompt(context, audience_key, repo_url)
+    
+    # Market data is the last piece of the prompt, so wait for it only now
+    if inspect.isawaitable(market_analysis):
+        try:
+            market_analysis = await market_analysis
+        except Exception as e:
+            logger.warning("market analysis unavailable: %s", e)
+            market_analysis = {"error": str(e)}
     
     # Add market analysis to prompt
     market_content = _format_market_analysis_for_prompt(market_analysis)
     
-    # Add emphasis on accuracy
-    accuracy_note = """
-CRITICAL INSTRUCTION: Use ONLY information from the repository context provided above.
-- Do NOT make up or assume technologies, features, or details
-- If the repository uses Weaviate, say Weaviate (not MongoDB)
-- If the repository uses specific libraries, mention those exact libraries
-- Base ALL content on the actual code, commits, and documentation provided
-"""
-    
-    full_prompt = f"{prompt}\n\n{accuracy_note}\n\nMarket Analysis Data:\n{market_content}"
-    
-    # Call Dedalus AI
-    client = AsyncDedalus()
-    runner = DedalusRunner(client)
-    
-    result = await runner.run(
-        input=full_prompt,
-        model="openai/gpt-4o-mini",
+    # Static instructions first, per-request data last
+    full_prompt = (
+        f"{static_prefix}\n{_ACCURACY_NOTE}\n{dynamic_suffix}"
+        f"\n\nMarket Analysis Data:\n{market_content}"
     )
     
-    output = getattr(result, "final_output", "")
+    cache_key = get_llm_cache_key(_PITCH_DECK_MODEL, full_prompt)
+    cached_output = get_cached_llm_output(cache_key) if use_cache else None
+    output = cached_output
+    
+    if output is not None:
+        logger.info("using cached pitch deck response")
+    else:
+        # Call Dedalus AI
+        runner = get_dedalus_runner()
+        
+        result = await runner.run(
+            input=full_prompt,
+            model=_PITCH_DECK_MODEL,
+        )
+        
+        output = getattr(result, "final_output", "")
     
     if not output or not output.strip():
         raise ValueError("Empty response from LLM")
     
-    print(f"  📝 LLM Response (first 200 chars): {output[:200]}...")
+    logger.debug("llm response: %.200s", output)
     
     # Parse JSON response
-    clean_json = _extract_json(output)
+    clean_json = extract_json(output)
     
-    print(f"  🧹 Cleaned JSON (first 200 chars): {clean_json[:200]}...")
+    logger.debug("cleaned json: %.200s", clean_json)
     
     try:
-        pitch_deck = json.loads(clean_json)
-    except json.JSONDecodeError as e:
-        print(f"  ❌ JSON Parse Error: {str(e)}")
-        print(f"  📄 Full cleaned output: {clean_json[:500]}...")
+        pitch_deck = orjson.loads(clean_json)
+    except orjson.JSONDecodeError as e:
+        logger.error("pitch deck json parse error: %s; output: %.500s", e, clean_json)
         raise ValueError(f"Failed to parse pitch deck JSON: {str(e)}")
     
-    print(f"  ✓ Generated {len(pitch_deck.get('slides', []))} slides")
+    # Store only fresh responses, and only once they have parsed
+    if use_cache and cached_output is None:
+        cache_llm_output(cache_key, output)
+    
+    _normalize_slides(pitch_deck)
+    
+    logger.info("generated %d slides", len(pitch_deck.get('slides', [])))
     
     return pitch_deck
 
 
+def _normalize_slides(pitch_deck: Dict[str, Any]) -> None:
+    """
+    Coerce every slide in place so the renderers see one shape: content as a
+    list of non-empty stripped strings, speaker_notes as a single string.
+    """
+    for slide in pitch_deck.get("slides", []):
+        content = slide.get("content", "")
+        if isinstance(content, list):
+            items = (str(item).strip() for item in content)
+        elif isinstance(content, str):
+            items = (line.strip() for line in content.split('\n'))
+        else:
+            items = (str(content).strip(),)
+        slide["content"] = [item for item in items if item]
+        
+        notes = slide.get("speaker_notes", "")
+        if isinstance(notes, list):
+            slide["speaker_notes"] = "\n".join(str(item) for item in notes)
+        else:
+            slide["speaker_notes"] = str(notes)
+
+
+# Formatted market sections keyed by the analysis content, least recently used first
+_MARKET_PROMPT_CACHE_MAX_ENTRIES = 64
+_MARKET_PROMPT_CACHE: "OrderedDict[bytes, str]" = OrderedDict()
+
+
 def _format_market_analysis_for_prompt(market_analysis: Dict[str, Any]) -> str:
+    """Format market analysis data for inclusion in prompt, reusing earlier results."""
+    try:
+        key = orjson.dumps(market_analysis, option=orjson.OPT_SORT_KEYS)
+    except TypeError:
+        return _render_market_analysis(market_analysis)
+    
+    text = _MARKET_PROMPT_CACHE.get(key)
+    if text is None:
+        text = _render_market_analysis(market_analysis)
+        _MARKET_PROMPT_CACHE[key] = text
+        if len(_MARKET_PROMPT_CACHE) > _MARKET_PROMPT_CACHE_MAX_ENTRIES:
+            _MARKET_PROMPT_CACHE.popitem(last=False)
+    else:
+        _MARKET_PROMPT_CACHE.move_to_end(key)
+    return text
+
+
+def _render_market_analysis(market_analysis: Dict[str, Any]) -> str:
     """Format market analysis data for inclusion in prompt."""
     if not market_analysis or "error" in market_analysis:
         return "Market analysis data unavailable."
@@ -102,25 +183,3 @@ def _format_market_analysis_for_prompt(market_analysis: Dict[str, Any]) -> str:
         parts.append(f"Opportunities: {', '.join(trends.get('opportunities', []))}")
     
     return "\n".join(parts)
-
-
-def _extract_json(response: str) -> str:
-    """Extract JSON from LLM response."""
-    import re
-    
-    clean = response.strip()
-    
-    # Remove markdown code blocks
-    if '```' in clean:
-        json_match = re.search(r'```(?:json)?\s*\n(.*?)\n```', clean, re.DOTALL)
-        if json_match:
-            clean = json_match.group(1).strip()
-    
-    # Extract from first { to last }
-    if not clean.startswith('{'):
-        json_start = clean.find('{')
-        json_end = clean.rfind('}')
-        if json_start != -1 and json_end != -1:
-            clean = clean[json_start:json_end+1]
-    
-    return clean
@@ -1,22 +1,46 @@
 """Sector analysis service using Dedalus AI."""
-import json
-import re
+import logging
+import orjson
 from typing import Dict, List, Optional
-from dedalus_labs import AsyncDedalus, DedalusRunner
+from services.dedalus_client import get_dedalus_runner
+from services._json_utils import extract_json
+from services.llm_cache import get_llm_cache_key, get_cached_llm_output, cache_llm_output
 
+# Try to import pyahocorasick for a single-pass keyword scan
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
-async def analyze_repository_sector(context: str, repo_name: str) -> Dict[str, any]:
+logger = logging.getLogger(__name__)
+
+_SECTOR_MODEL = "openai/gpt-4o-mini"
+
+# The sector prompt only needs the start of the repository context
+_SECTOR_CONTEXT_CHARS = 5000
+
+
+async def analyze_repository_sector(
+    context: str,
+    repo_name: str,
+    use_cache: bool = True
+) -> Dict[str, any]:
     """
     Analyze repository content to extract primary sector and technologies.
     
     Args:
         context: Repository content from vector database
         repo_name: Name of the repository
+        use_cache: Reuse a stored LLM response for an identical prompt
         
     Returns:
         Dict with primary_sector, secondary_tech, and description
     """
-    print(f"🔍 Analyzing repository content for sector detection...")
+    logger.info("analyzing repository content for sector detection")
+    
+    # Slicing returns the string itself when it is already short enough
+    context_excerpt = context[:_SECTOR_CONTEXT_CHARS]
     
     # Build analysis prompt with emphasis on accuracy
     analysis_prompt = f"""CRITICAL: Analyze ONLY the actual repository content provided below. Do NOT make assumptions or add information not present in the content.
@@ -24,7 +48,7 @@ async def analyze_repository_sector(context: str, repo_name: str) -> Dict[str, a
 Repository: {repo_name}
 
 ACTUAL REPOSITORY CONTENT:
-{context[:5000]}
+{context_excerpt}
 
 Extract from the ACTUAL content above:
 1. PRIMARY purpose/sector (e.g., education, healthcare, finance)
@@ -46,36 +70,45 @@ Respond in JSON format:
     "key_features": ["feature1", "feature2"]
 }}"""
 
-    # Call Dedalus AI
-    client = AsyncDedalus()
-    runner = DedalusRunner(client)
+    cache_key = get_llm_cache_key(_SECTOR_MODEL, analysis_prompt)
+    cached_output = get_cached_llm_output(cache_key) if use_cache else None
+    output = cached_output
     
     try:
-        print(f"  🤖 Calling LLM for sector analysis...")
-        
-        result = await runner.run(
-            input=analysis_prompt,
-            model="openai/gpt-4o-mini",
-        )
-        
-        output = getattr(result, "final_output", "")
+        if output is not None:
+            logger.info("using cached sector analysis")
+        else:
+            logger.debug("calling llm for sector analysis")
+            
+            # Call Dedalus AI
+            runner = get_dedalus_runner()
+            
+            result = await runner.run(
+                input=analysis_prompt,
+                model=_SECTOR_MODEL,
+            )
+            
+            output = getattr(result, "final_output", "")
         
         if not output or not output.strip():
             raise ValueError("Empty LLM response")
         
         # Extract JSON from response (handles markdown code blocks)
-        clean_json = _extract_json_from_response(output)
+        clean_json = extract_json(output)
         
         # Parse JSON
-        sector_data = json.loads(clean_json)
+        sector_data = orjson.loads(clean_json)
         
         primary_sector = sector_data.get("primary_sector", "software")
         secondary_tech = sector_data.get("secondary_tech", [])
         description = sector_data.get("description", repo_name)
         
-        print(f"  ✓ Primary Sector: {primary_sector}")
-        print(f"  ✓ Secondary Tech: {', '.join(secondary_tech)}")
-        print(f"  ✓ Description: {description[:100]}...")
+        # Store only fresh responses, and only once they have parsed
+        if use_cache and cached_output is None:
+            cache_llm_output(cache_key, output)
+        
+        logger.info("primary sector: %s, secondary tech: %s", primary_sector, secondary_tech)
+        logger.debug("description: %.100s", description)
         
         return {
             "primary_sector": primary_sector,
@@ -85,7 +118,7 @@ Respond in JSON format:
         }
         
     except Exception as e:
-        print(f"  ⚠️  Sector analysis failed: {str(e)}")
+        logger.warning("sector analysis failed: %s", e)
         
         # Fallback to simple detection
         return {
@@ -96,41 +129,58 @@ Respond in JSON format:
         }
 
 
-def _extract_json_from_response(response: str) -> str:
-    """Extract JSON from LLM response that may contain markdown or explanatory text."""
-    clean = response.strip()
-    
-    # Strategy 1: Extract from markdown code blocks
-    if '```' in clean:
-        json_match = re.search(r'```(?:json)?\s*\n(.*?)\n```', clean, re.DOTALL)
-        if json_match:
-            clean = json_match.group(1).strip()
-    
-    # Strategy 2: Extract from first { to last }
-    if not clean.startswith('{'):
-        json_start = clean.find('{')
-        json_end = clean.rfind('}')
-        if json_start != -1 and json_end != -1 and json_end > json_start:
-            clean = clean[json_start:json_end+1]
-    
-    return clean
+# Fallback tech detection: keyword indicators per technology, in priority order
+_TECH_INDICATORS = {
+    'AI': ['ai', 'artificial intelligence', 'machine learning', 'ml', 'gpt', 'llm'],
+    'Python': ['python', '.py', 'django', 'flask', 'fastapi'],
+    'JavaScript': ['javascript', '.js', 'react', 'vue', 'angular', 'node'],
+    'TypeScript': ['typescript', '.ts', 'tsx'],
+    'Blockchain': ['blockchain', 'web3', 'ethereum', 'smart contract'],
+}
+
+
+def _build_tech_automaton():
+    """Build one automaton mapping every indicator to its technology."""
+    automaton = ahocorasick.Automaton()
+    for tech, indicators in _TECH_INDICATORS.items():
+        for indicator in indicators:
+            automaton.add_word(indicator, tech)
+    automaton.make_automaton()
+    return automaton
+
+
+_TECH_AUTOMATON = _build_tech_automaton() if AHOCORASICK_AVAILABLE else None
+
+
+# Contexts are lowercased a chunk at a time rather than copied whole
+_SCAN_CHUNK_CHARS = 64 * 1024
+_SCAN_OVERLAP = max(len(ind) for indicators in _TECH_INDICATORS.values() for ind in indicators) - 1
+
+
+def _lowered_chunks(text: str):
+    """Yield lowercased chunks of text; the overlap keeps indicators spanning a boundary whole."""
+    for start in range(0, len(text), _SCAN_CHUNK_CHARS):
+        yield text[max(0, start - _SCAN_OVERLAP):start + _SCAN_CHUNK_CHARS].lower()
 
 
 def _detect_tech_from_context(context: str) -> List[str]:
     """Fallback: Detect tech stack from context using keywords."""
-    tech_indicators = {
-        'AI': ['ai', 'artificial intelligence', 'machine learning', 'ml', 'gpt', 'llm'],
-        'Python': ['python', '.py', 'django', 'flask', 'fastapi'],
-        'JavaScript': ['javascript', '.js', 'react', 'vue', 'angular', 'node'],
-        'TypeScript': ['typescript', '.ts', 'tsx'],
-        'Blockchain': ['blockchain', 'web3', 'ethereum', 'smart contract'],
-    }
+    found = set()
     
-    detected = []
-    context_lower = context.lower() if context else ""
-    
-    for tech, indicators in tech_indicators.items():
-        if any(ind in context_lower for ind in indicators):
-            detected.append(tech)
+    for chunk in _lowered_chunks(context or ""):
+        if _TECH_AUTOMATON is not None:
+            # One pass over the chunk finds every indicator at once
+            for _, tech in _TECH_AUTOMATON.iter(chunk):
+                found.add(tech)
+        else:
+            found.update(
+                tech for tech, indicators in _TECH_INDICATORS.items()
+                if tech not in found and any(ind in chunk for ind in indicators)
+            )
+        
+        # Later chunks can't change the answer once everything has matched
+        if len(found) == len(_TECH_INDICATORS):
+            break
     
+    detected = [tech for tech in _TECH_INDICATORS if tech in found]
     return detected[:3]  # Return top 3
@@ -1,15 +1,77 @@
-from git import Repo
+from git import Repo, Git, GitCommandError
+import codecs
 from pathlib import Path
 import tempfile
 import shutil
+import os
+import subprocess
 from pprint import pprint
 import fnmatch
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+_DIFF_HEADER_RE = re.compile(r"^diff --git (.*)$", re.M)
+_QUOTED_A_PATH_RE = re.compile(r'^"a/(?:[^"\\]|\\.)*" b/(.*)$')
+_QUOTED_B_PATH_RE = re.compile(r' "b/((?:[^"\\]|\\.)*)"$')
+_C_ESCAPES = {"a": 7, "b": 8, "t": 9, "n": 10, "v": 11, "f": 12, "r": 13, '"': 34, "\\": 92}
+
+def unquote_path(path: str) -> str:
+    # Git C-quotes paths with special or non-ASCII characters ("caf\303\251.md");
+    # undo that, octal escapes being raw UTF-8 bytes
+    if len(path) < 2 or not (path.startswith('"') and path.endswith('"')):
+        return path
+    body = path[1:-1]
+    out = bytearray()
+    i = 0
+    while i < len(body):
+        if body[i] == "\\" and i + 1 < len(body):
+            if body[i + 1] in "01234567":
+                out.append(int(body[i + 1:i + 4], 8) & 0xFF)
+                i += 4
+            else:
+                out.append(_C_ESCAPES.get(body[i + 1], ord(body[i + 1])))
+                i += 2
+        else:
+            out += body[i].encode()
+            i += 1
+    return out.decode("utf-8", errors="replace")
+
+def _header_new_path(rest: str) -> str:
+    # rest is the header after "diff --git "; either side may be quoted
+    if rest.endswith('"'):
+        m = _QUOTED_B_PATH_RE.search(rest)
+        if m:
+            return unquote_path(f'"{m.group(1)}"')
+    if rest.startswith('"'):
+        m = _QUOTED_A_PATH_RE.match(rest)
+        if m:
+            return m.group(1)
+    rest = rest[len("a/"):]
+    half = (len(rest) - 3) // 2
+    # Unrenamed paths appear twice, so this also handles " b/" inside a path
+    if rest[half:half + 3] == " b/" and rest[:half] == rest[half + 3:]:
+        return rest[:half]
+    return rest.rsplit(" b/", 1)[-1]
+
+def split_patch(diff_text: str) -> dict:
+    # Map each file's new path to its section of the patch, cut at the
+    # "diff --git" headers git writes between files
+    headers = list(_DIFF_HEADER_RE.finditer(diff_text))
+    file_diffs = {}
+    for i, m in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(diff_text)
+        path = _header_new_path(m.group(1))
+        file_diffs.setdefault(path, diff_text[m.start():end].rstrip("\n"))
+    return file_diffs
 
 def get_repo(url: str, branch: str | None = None, max_commits: int = 5):
     temp_dir = tempfile.mkdtemp(prefix="temp_repo_")
-    repo = Repo.clone_from(url, temp_dir, depth=50, single_branch=True)
-    if branch:
-        repo.git.checkout(branch)
+    # Blobless clone with no checkout: commits and trees come down up front,
+    # blobs are fetched on demand for the diffs and doc files actually read
+    repo = Repo.clone_from(
+        url, temp_dir, branch=branch, depth=50, single_branch=True,
+        no_tags=True, no_checkout=True, filter="blob:none",
+    )
 
     root = Path(temp_dir)
 
@@ -35,6 +97,10 @@ def get_repo(url: str, branch: str | None = None, max_commits: int = 5):
         ".json", ".env", ".dockerfile", ".gradle", ".cfg"
     }
 
+    # All test globs as one compiled alternation
+    test_re = re.compile("|".join(f"(?:{fnmatch.translate(pat)})" for pat in test_globs))
+    max_file_bytes = 200_000
+
     def is_excluded_path(rel: Path) -> bool:
         parts = set(rel.parts)
         if parts & exclude_dirs:
@@ -42,23 +108,11 @@ def get_repo(url: str, branch: str | None = None, max_commits: int = 5):
         if rel.name in lockfiles:
             return True
         rel_str = rel.as_posix()
-        for pat in test_globs:
-            if fnmatch.fnmatch(rel_str, pat):
-                return True
-        p = (root / rel)
-        try:
-            if p.exists() and p.is_file() and p.stat().st_size > 200_000:
-                return True
-        except Exception:
-            pass
+        if test_re.match(rel_str):
+            return True
         return False
 
-    commits = []
-    for c in repo.iter_commits(max_count=max_commits):
-        try:
-            name_only = repo.git.show(c.hexsha, "--name-only", "--pretty=").strip().splitlines()
-        except Exception:
-            name_only = []
+    def included_source_paths(name_only):
         included_paths = []
         for n in name_only:
             if not n:
@@ -69,51 +123,124 @@ def get_repo(url: str, branch: str | None = None, max_commits: int = 5):
             # Only include source file extensions (skip docs/assets)
             if rel.suffix.lower() in allowed_source_ext:
                 included_paths.append(rel.as_posix())
+        return included_paths
 
-        diff_text = ""
-        if included_paths:
-            # Use minimal context to reduce size
-            diff_text = repo.git.show(
-                c.hexsha,
-                "--format=",
-                "--patch",
-                "--no-color",
-                "-U2",
-                "--",
-                *included_paths,
-            )
-            # Cap diff size to avoid huge payloads
-            MAX_DIFF_CHARS = 80_000
-            if len(diff_text) > MAX_DIFF_CHARS:
-                diff_text = diff_text[:MAX_DIFF_CHARS] + "\n...\n[diff truncated]\n"
+    def read_patch(hexsha: str, included_paths) -> str:
+        # Use minimal context to reduce size
+        proc = repo.git.show(
+            hexsha,
+            "--format=",
+            "--patch",
+            "--no-color",
+            "-U2",
+            "--",
+            *included_paths,
+            as_process=True,
+        )
+        # Cap diff size to avoid huge payloads; stop reading (and stop git)
+        # once past the cap instead of loading the whole patch
+        MAX_DIFF_CHARS = 80_000
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        parts = []
+        size = 0
+        while size <= MAX_DIFF_CHARS + 1:
+            chunk = proc.stdout.read(64 * 1024)
+            if not chunk:
+                break
+            parts.append(decoder.decode(chunk))
+            size += len(parts[-1])
+        parts.append(decoder.decode(b"", final=True))
 
+        killed = size > MAX_DIFF_CHARS + 1
+        if killed:
+            proc.proc.kill()
+            proc.proc.wait()
+        else:
+            proc.wait()
+
+        diff_text = "".join(parts)
+        # Same trailing-newline strip GitPython applies to captured output
+        if not killed and diff_text.endswith("\n"):
+            diff_text = diff_text[:-1]
+        if len(diff_text) > MAX_DIFF_CHARS:
+            diff_text = diff_text[:MAX_DIFF_CHARS] + "\n...\n[diff truncated]\n"
+        return diff_text
+
+    def commit_diff(hexsha: str, included_paths):
+        diff_text = read_patch(hexsha, included_paths)
+        # git show fetched the commit's blobs in one batch before writing the
+        # patch, so sizing them now is local. Sizes are as of the commit (the
+        # checkout only holds docs); deleted files aren't listed and are kept
+        oversized = set()
+        for entry in repo.git.ls_tree("-l", "-z", hexsha, "--", *included_paths).split("\0"):
+            meta, _, path = entry.partition("\t")
+            size = meta.split()[-1] if path else ""
+            if size.isdigit() and int(size) > max_file_bytes:
+                oversized.add(path)
+        if oversized:
+            # Rare: redo the (now local) patch without the oversized files
+            included_paths = [path for path in included_paths if path not in oversized]
+            diff_text = read_patch(hexsha, included_paths) if included_paths else ""
+        return included_paths, diff_text
+
+    # One git log call returns every commit's metadata and changed files;
+    # fields are NUL-separated, the file list follows each commit's fields
+    log = repo.git.log(
+        f"-{max_commits}",
+        "--name-only",
+        "--pretty=format:%x00%H%x00%an%x00%ae%x00%cI%x00%B%x00",
+    )
+    fields = log.split("\0")[1:]
+    commits = []
+    for i in range(0, len(fields) - 5, 6):
+        hexsha, author, email, date, message, files = fields[i:i + 6]
         commits.append({
-            "hash": c.hexsha,
-            "author": str(c.author),
-            "email": getattr(c.author, "email", None),
-            "date": c.committed_datetime.isoformat(),
-            "message": c.message.strip(),
-            "diff": diff_text,
-            "files": included_paths,
+            "hash": hexsha,
+            "author": author,
+            "email": email,
+            "date": date,
+            "message": message.strip(),
+            "diff": "",
+            "file_diffs": {},
+            "files": included_source_paths([unquote_path(path) for path in files.splitlines()]),
         })
 
-    doc_files = set()
-    for pat in ("*.md", "*.rst", "*.adoc"):
-        for p in root.rglob(pat):
-            rel = p.relative_to(root)
-            if is_excluded_path(rel):
-                continue
-            doc_files.add(p)
-    for p in (root / "docs").rglob("*") if (root / "docs").exists() else []:
-        if p.is_file():
-            doc_files.add(p)
-    for pat in ("README*", "CONTRIBUTING*", "LICENSE*"):
-        for p in root.glob(pat):
-            if p.is_file():
-                doc_files.add(p)
+    # Patches are only needed for commits that touched included source files;
+    # each git show is its own process, so run them side by side
+    with_files = [commit for commit in commits if commit["files"]]
+    if with_files:
+        with ThreadPoolExecutor(max_workers=min(len(with_files), 8)) as pool:
+            diffs = pool.map(commit_diff, [c["hash"] for c in with_files], [c["files"] for c in with_files])
+            for commit, (included_paths, diff_text) in zip(with_files, diffs):
+                commit["files"] = included_paths
+                commit["diff"] = diff_text
+                commit["file_diffs"] = split_patch(diff_text)
+
+    # Pick doc files from the tree listing so only those blobs are checked out.
+    # Plain string checks reject most entries (e.g. all of node_modules/*.js);
+    # a Path is only built for doc candidates that need the exclusion rules
+    doc_ext = (".md", ".rst", ".adoc")
+    doc_prefixes = ("README", "CONTRIBUTING", "LICENSE")
+    doc_paths = []
+    for entry in repo.git.ls_tree("-r", "-z", "HEAD").split("\0"):
+        meta, _, path = entry.partition("\t")
+        if " blob " not in meta:
+            continue
+        if path.startswith("docs/"):
+            doc_paths.append(path)
+        elif "/" not in path and path.startswith(doc_prefixes):
+            doc_paths.append(path)
+        elif path.endswith(doc_ext) and not is_excluded_path(Path(path)):
+            doc_paths.append(path)
+
+    # Same order as sorting the Paths: component by component
+    doc_paths = sorted(doc_paths, key=lambda s: s.split("/"))[:20]
+    if doc_paths:
+        repo.git.checkout("HEAD", "--", *doc_paths, env={"GIT_LITERAL_PATHSPECS": "1"})
 
     documentation = []
-    for p in list(sorted(doc_files))[:20]:
+    for path in doc_paths:
+        p = root / path
         try:
             if p.stat().st_size > 120_000:
                 continue
@@ -127,15 +254,31 @@ def get_repo(url: str, branch: str | None = None, max_commits: int = 5):
 
     return {
         "repo_path": temp_dir,
+        "head_sha": repo.head.commit.hexsha,
         "commits": commits,
         "documentation": documentation,
     }
 
+def get_remote_head_sha(url: str, branch: str | None = None) -> str | None:
+    # Resolve the tip commit without cloning (single ls-remote round trip)
+    ref = f"refs/heads/{branch}" if branch else "HEAD"
+    try:
+        out = Git().ls_remote(url, ref)
+    except GitCommandError:
+        return None
+    line = out.split("\n", 1)[0]
+    return line.split()[0] if line else None
+
 def cleanup_repo(repo_path: str) -> bool:
     try:
         p = Path(repo_path)
         if p.exists() and p.is_dir() and p.name.startswith("temp_repo_"):
-            shutil.rmtree(p)
+            # rm -rf removes the many small .git object files far faster than
+            # rmtree's per-entry Python calls
+            if os.name == "nt":
+                shutil.rmtree(p)
+            else:
+                subprocess.run(["rm", "-rf", "--", str(p)], check=True)
             return True
     except Exception:
         return False
@@ -1,8 +1,21 @@
 """Text chunking utilities for documentation and commits."""
-from typing import List, Dict, Any
+import hashlib
+from typing import List, Dict, Any, Optional
 
+# Try to import pyahocorasick for a single-pass file path scan
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
-def chunk_text(text: str, chunk_size: int = 1500, overlap: int = 200) -> List[str]:
+
+def chunk_text(
+    text: str,
+    chunk_size: int = 1500,
+    overlap: int = 200,
+    max_chunks: Optional[int] = None
+) -> List[str]:
     """
     Split text into overlapping chunks.
     
@@ -10,6 +23,7 @@ def chunk_text(text: str, chunk_size: int = 1500, overlap: int = 200) -> List[st
         text: Text to chunk
         chunk_size: Target size of each chunk in characters
         overlap: Number of characters to overlap between chunks
+        max_chunks: Stop after this many chunks (default: chunk all of it)
         
     Returns:
         List of text chunks
@@ -20,19 +34,21 @@ def chunk_text(text: str, chunk_size: int = 1500, overlap: int = 200) -> List[st
     chunks = []
     start = 0
     
-    while start < len(text):
+    while start < len(text) and (max_chunks is None or len(chunks) < max_chunks):
         end = start + chunk_size
         
-        # Try to break at a newline or space
+        # Try to break at a newline or space in the second half of the chunk;
+        # earlier breaks are never used, so they aren't searched either
         if end < len(text):
+            min_break = start + chunk_size // 2 + 1
             # Look for newline first
-            newline_pos = text.rfind('\n', start, end)
-            if newline_pos > start + chunk_size // 2:
+            newline_pos = text.rfind('\n', min_break, end)
+            if newline_pos != -1:
                 end = newline_pos + 1
             else:
                 # Fall back to space
-                space_pos = text.rfind(' ', start, end)
-                if space_pos > start + chunk_size // 2:
+                space_pos = text.rfind(' ', min_break, end)
+                if space_pos != -1:
                     end = space_pos + 1
         
         chunks.append(text[start:end].strip())
@@ -62,12 +78,13 @@ def chunk_documentation(docs: List[Dict[str, str]], max_chunks_per_doc: int = 5)
         if not content.strip():
             continue
         
-        chunks = chunk_text(content, chunk_size=1500, overlap=200)
+        chunks = chunk_text(content, chunk_size=1500, overlap=200, max_chunks=max_chunks_per_doc)
         
         # Limit chunks per doc
         for idx, chunk in enumerate(chunks[:max_chunks_per_doc]):
             all_chunks.append({
-                "id": f"doc:{path}:{idx}",
+                # Content hash: an edited chunk gets a new ID and is re-embedded
+                "id": f"doc:{path}:{idx}:{hashlib.blake2b(chunk.encode(), digest_size=6).hexdigest()}",
                 "text": chunk,
                 "metadata": {
                     "type": "doc",
@@ -80,12 +97,39 @@ def chunk_documentation(docs: List[Dict[str, str]], max_chunks_per_doc: int = 5)
     return all_chunks
 
 
+def _first_positions(text: str, needles: List[str]) -> Dict[str, int]:
+    """Map each needle found in text to the index of its first occurrence."""
+    if not AHOCORASICK_AVAILABLE:
+        positions = {}
+        for needle in needles:
+            pos = text.find(needle)
+            if pos != -1:
+                positions[needle] = pos
+        return positions
+    
+    automaton = ahocorasick.Automaton()
+    for needle in needles:
+        automaton.add_word(needle, needle)
+    automaton.make_automaton()
+    
+    # One pass over the text; matches come in order of their end index, so
+    # a needle's first match is its first occurrence
+    positions = {}
+    for end, needle in automaton.iter(text):
+        if needle not in positions:
+            positions[needle] = end - len(needle) + 1
+            if len(positions) == len(automaton):
+                break
+    return positions
+
+
 def chunk_commits(commits: List[Dict[str, Any]], max_files_per_commit: int = 5, max_diff_chars: int = 1000) -> List[Dict[str, Any]]:
     """
     Chunk commit data into searchable pieces.
     
     Args:
-        commits: List of commit dicts with hash, message, diff, files
+        commits: List of commit dicts with hash, message, diff, files and
+            optionally file_diffs (file path -> that file's patch section)
         max_files_per_commit: Maximum number of file chunks per commit
         max_diff_chars: Maximum characters of diff to include per file
         
@@ -119,19 +163,30 @@ def chunk_commits(commits: List[Dict[str, Any]], max_files_per_commit: int = 5,
             })
             continue
         
+        chunk_files = files[:max_files_per_commit]
+        
+        # get_repo splits the patch per file; for files it has no section for,
+        # fall back to the heuristic that a file's snippet starts where it's
+        # first mentioned
+        file_diffs = commit.get("file_diffs") or {}
+        unsplit_files = [file_path for file_path in chunk_files if file_path not in file_diffs]
+        file_positions = _first_positions(diff, unsplit_files) if diff and unsplit_files else {}
+        diff_head = diff[:max_diff_chars]
+        
         # Create per-file chunks
-        for idx, file_path in enumerate(files[:max_files_per_commit]):
+        for idx, file_path in enumerate(chunk_files):
             # Extract diff snippet for this file if available
             diff_snippet = ""
             if diff:
-                # Simple heuristic: look for the file in the diff
-                if file_path in diff:
-                    start = diff.find(file_path)
+                start = file_positions.get(file_path)
+                if file_path in file_diffs:
+                    diff_snippet = file_diffs[file_path][:max_diff_chars]
+                elif start is not None:
                     # Get a reasonable chunk around this file
                     diff_snippet = diff[start:start + max_diff_chars]
                 else:
                     # Just take the first part of the diff
-                    diff_snippet = diff[:max_diff_chars]
+                    diff_snippet = diff_head
             
             chunk_text = f"Commit: {message}\nFile: {file_path}\nAuthor: {author}\nDate: {date}\n\nDiff:\n{diff_snippet}"
             
@@ -1,8 +1,17 @@
 """FastEmbed wrapper for Chroma embedding function."""
+from functools import lru_cache
 from typing import cast
 from chromadb.api.types import EmbeddingFunction, Documents, Embeddings
 from fastembed import TextEmbedding
 
+EMBED_BATCH_SIZE = 64
+
+
+@lru_cache(maxsize=4)
+def _load_model(model_name: str) -> TextEmbedding:
+    """Load a FastEmbed model once per process; loading reads the ONNX weights from disk."""
+    return TextEmbedding(model_name=model_name)
+
 
 class FastEmbedEmbeddingFunction(EmbeddingFunction[Documents]):
     """Chroma-compatible embedding function using FastEmbed."""
@@ -15,7 +24,7 @@ class FastEmbedEmbeddingFunction(EmbeddingFunction[Documents]):
             model_name: FastEmbed model name. Default is a lightweight, fast model.
                        Other options: "sentence-transformers/all-MiniLM-L6-v2"
         """
-        self._model = TextEmbedding(model_name=model_name)
+        self._model = _load_model(model_name)
     
     def __call__(self, input: Documents) -> Embeddings:
         """
@@ -27,7 +36,11 @@ class FastEmbedEmbeddingFunction(EmbeddingFunction[Documents]):
         Returns:
             List of embedding vectors
         """
-        # FastEmbed returns a generator of numpy arrays
-        embeddings = list(self._model.embed(input))
-        # Convert to list of lists for Chroma
-        return [embedding.tolist() for embedding in embeddings]
+        # FastEmbed yields float32 numpy arrays, which Chroma accepts as-is
+        return list(self._model.embed(input, batch_size=EMBED_BATCH_SIZE))
+
+
+@lru_cache(maxsize=1)
+def get_default_embedding_function() -> FastEmbedEmbeddingFunction:
+    """Shared embedding function with the default model."""
+    return FastEmbedEmbeddingFunction()
@@ -1,8 +1,51 @@
 """Index repository data into Chroma vector store."""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Dict, Any, List
 from .store import get_client, get_or_create_collection, get_repo_hash
+from .embeddings import get_default_embedding_function
+from .retrieval import invalidate_query_cache
 from .chunker import chunk_documentation, chunk_commits
 
+logger = logging.getLogger(__name__)
+
+# Written into persist_dir after a successful index; holds the indexed commit
+# SHA and its mtime is the index age
+INDEXED_MARKER = ".indexed_at"
+
+# Chunks embedded and added per collection.add call
+INDEX_BATCH_SIZE = 256
+
+
+def is_index_fresh(persist_dir: str, max_age_seconds: float, head_sha: str | None) -> bool:
+    """
+    Check whether persist_dir holds an index of head_sha completed within max_age_seconds.
+    
+    Args:
+        persist_dir: Directory the repository was indexed into
+        max_age_seconds: Maximum age of the index to consider it fresh
+        head_sha: Current remote HEAD commit; None (unknown) is never fresh
+        
+    Returns:
+        True if the index can be reused without re-cloning
+    """
+    if not head_sha:
+        return False
+    
+    marker = Path(persist_dir) / INDEXED_MARKER
+    try:
+        indexed_at = marker.stat().st_mtime
+        indexed_sha = marker.read_text().strip()
+    except OSError:
+        return False
+    return indexed_sha == head_sha and time.time() - indexed_at < max_age_seconds
+
+
+def _write_indexed_marker(persist_dir: str, head_sha: str | None) -> None:
+    (Path(persist_dir) / INDEXED_MARKER).write_text(head_sha or "")
+
 
 def index_repo(
     repo_data: Dict[str, Any],
@@ -29,7 +72,8 @@ def index_repo(
     
     # Get client and collection
     client = get_client(persist_dir)
-    collection = get_or_create_collection(client, collection_name)
+    embedding_function = get_default_embedding_function()
+    collection = get_or_create_collection(client, collection_name, embedding_function)
     
     # Chunk documentation
     doc_chunks = chunk_documentation(repo_data.get("documentation", []))
@@ -41,22 +85,53 @@ def index_repo(
     all_chunks = doc_chunks + commit_chunks
     
     if not all_chunks:
-        print(f"Warning: No chunks to index for {repo_url}")
+        logger.warning("no chunks to index for %s", repo_url)
+        _write_indexed_marker(persist_dir, repo_data.get("head_sha"))
         return collection_name
     
+    # Chunk IDs are deterministic (commit SHA, or doc path plus content hash),
+    # so chunks already in the collection don't need embedding again
+    chunk_ids = {chunk["id"] for chunk in all_chunks}
+    existing = set(collection.get(ids=list(chunk_ids), include=[])["ids"])
+    
+    # Doc chunks from an earlier version of a file carry a different hash
+    stale_doc_ids = [
+        chunk_id for chunk_id in collection.get(where={"type": "doc"}, include=[])["ids"]
+        if chunk_id not in chunk_ids
+    ]
+    if stale_doc_ids:
+        collection.delete(ids=stale_doc_ids)
+    
     # Prepare data for Chroma
-    ids = [chunk["id"] for chunk in all_chunks]
-    documents = [chunk["text"] for chunk in all_chunks]
-    metadatas = [chunk["metadata"] for chunk in all_chunks]
+    new_chunks = [chunk for chunk in all_chunks if chunk["id"] not in existing]
+    ids = [chunk["id"] for chunk in new_chunks]
+    documents = [chunk["text"] for chunk in new_chunks]
+    metadatas = [chunk["metadata"] for chunk in new_chunks]
     
-    # Add to collection (Chroma will handle embeddings via the embedding function)
-    collection.add(
-        ids=ids,
-        documents=documents,
-        metadatas=metadatas
-    )
+    # Upsert in batches, embedding the next batch on a worker thread while the
+    # current one is written, so inference overlaps the index inserts
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(embedding_function, documents[:INDEX_BATCH_SIZE]) if ids else None
+        for start in range(0, len(ids), INDEX_BATCH_SIZE):
+            end = start + INDEX_BATCH_SIZE
+            embeddings = pending.result()
+            if end < len(ids):
+                pending = pool.submit(embedding_function, documents[end:end + INDEX_BATCH_SIZE])
+            
+            collection.upsert(
+                ids=ids[start:end],
+                documents=documents[start:end],
+                embeddings=embeddings,
+                metadatas=metadatas[start:end]
+            )
     
-    print(f"Indexed {len(all_chunks)} chunks ({len(doc_chunks)} docs, {len(commit_chunks)} commits) into collection '{collection_name}'")
+    _write_indexed_marker(persist_dir, repo_data.get("head_sha"))
+    invalidate_query_cache()
+    
+    logger.info(
+        "indexed %d chunks (%d docs, %d commits) into collection %r, %d newly embedded",
+        len(all_chunks), len(doc_chunks), len(commit_chunks), collection_name, len(new_chunks)
+    )
     
     return collection_name
 
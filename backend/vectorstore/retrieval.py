@@ -1,6 +1,92 @@
 """Retrieve relevant context from vector store."""
-from typing import List, Dict, Any
-from .store import get_client, get_or_create_collection, get_repo_hash
+import io
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import List, Dict, Any, Optional, Tuple
+from .store import get_client, get_collection, get_repo_hash
+
+# Query results keyed by (persist_dir, collection, query, k, index generation),
+# least recently used first. Indexing bumps the generation, so results cached
+# before a re-index are never served after it. Every hit shares the cached
+# rows, so metadata is stored as read-only mappings
+_QUERY_CACHE_MAX_ENTRIES = 256
+_QUERY_CACHE: "OrderedDict[tuple, Tuple[tuple, tuple, tuple]]" = OrderedDict()
+_QUERY_CACHE_LOCK = threading.Lock()
+_index_generation = 0
+
+
+def invalidate_query_cache() -> None:
+    """Drop cached query results; call after the vector store changes."""
+    global _index_generation
+    with _QUERY_CACHE_LOCK:
+        _index_generation += 1
+        _QUERY_CACHE.clear()
+
+
+def _query(
+    query: str,
+    k: int,
+    persist_dir: str,
+    collection_name: str,
+    doc_types: Optional[List[str]] = None
+) -> Optional[Tuple[tuple, tuple, tuple]]:
+    """
+    Query a collection, reusing the result of an identical earlier query.
+    
+    Chunk types are filtered inside Chroma's search rather than afterwards.
+    
+    Returns:
+        (documents, metadatas, distances), or None if the collection is missing
+    """
+    with _QUERY_CACHE_LOCK:
+        key = (persist_dir, collection_name, query, k, tuple(doc_types or ()), _index_generation)
+        cached = _QUERY_CACHE.get(key)
+        if cached is not None:
+            _QUERY_CACHE.move_to_end(key)
+            return cached
+    
+    client = get_client(persist_dir)
+    try:
+        collection = get_collection(client, collection_name)
+    except Exception:
+        return None
+    
+    rows = ((), (), ())
+    
+    # Never ask for more results than the collection holds
+    n_results = min(k, collection.count())
+    if n_results:
+        results = collection.query(
+            query_texts=[query],
+            n_results=n_results,
+            where={"type": {"$in": list(doc_types)}} if doc_types else None,
+            include=["documents", "metadatas", "distances"]
+        )
+        if results["documents"] and results["documents"][0]:
+            rows = (
+                tuple(results["documents"][0]),
+                tuple(MappingProxyType(metadata or {}) for metadata in results["metadatas"][0]),
+                tuple(results["distances"][0])
+            )
+    
+    with _QUERY_CACHE_LOCK:
+        # If a re-index finished meanwhile, key carries the old generation and
+        # is never looked up again
+        _QUERY_CACHE[key] = rows
+        if len(_QUERY_CACHE) > _QUERY_CACHE_MAX_ENTRIES:
+            _QUERY_CACHE.popitem(last=False)
+    return rows
+
+
+def _iter_results(rows: Tuple[tuple, tuple, tuple]):
+    """Iterate (document, metadata, distance) triples of a query result."""
+    documents, metadatas, distances = rows
+    return zip(documents, metadatas, distances, strict=True)
+
+
+_DOC_HEADER = "[Documentation: {}]".format
+_COMMIT_HEADER = "[Commit {}: {}]".format
 
 
 def retrieve_context(
@@ -9,7 +95,8 @@ def retrieve_context(
     k: int = 15,
     persist_dir: str = ".vectordb",
     collection_name: str | None = None,
-    max_context_chars: int = 12000
+    max_context_chars: int = 12000,
+    doc_types: List[str] | None = None
 ) -> str:
     """
     Retrieve relevant context from vector store for a query.
@@ -21,6 +108,8 @@ def retrieve_context(
         persist_dir: Directory where vector database is persisted
         collection_name: Optional custom collection name
         max_context_chars: Maximum characters in assembled context
+        doc_types: Only search chunks of these types ("doc", "commit");
+            default searches all
         
     Returns:
         Assembled context string
@@ -30,33 +119,19 @@ def retrieve_context(
         repo_hash = get_repo_hash(repo_url)
         collection_name = f"repo_{repo_hash}"
     
-    # Get client and collection
-    client = get_client(persist_dir)
-    
-    try:
-        collection = get_or_create_collection(client, collection_name)
-    except Exception as e:
-        return f"Error: Collection '{collection_name}' not found. Please index the repository first.\n{str(e)}"
-    
     # Query the collection
-    results = collection.query(
-        query_texts=[query],
-        n_results=k,
-        include=["documents", "metadatas", "distances"]
-    )
+    rows = _query(query, k, persist_dir, collection_name, doc_types)
+    if rows is None:
+        return f"Error: Collection '{collection_name}' not found. Please index the repository first."
     
-    if not results["documents"] or not results["documents"][0]:
+    if not rows[0]:
         return "No relevant context found in the repository."
     
-    # Assemble context from results
-    context_parts = []
+    # Assemble context from results, written straight into one buffer
+    out = io.StringIO()
     total_chars = 0
     
-    documents = results["documents"][0]
-    metadatas = results["metadatas"][0]
-    distances = results["distances"][0]
-    
-    for doc, metadata, distance in zip(documents, metadatas, distances):
+    for doc, metadata, distance in _iter_results(rows):
         # Check if we've exceeded the context limit
         if total_chars + len(doc) > max_context_chars:
             break
@@ -65,23 +140,21 @@ def retrieve_context(
         doc_type = metadata.get("type", "unknown")
         
         if doc_type == "doc":
-            path = metadata.get("path", "unknown")
-            header = f"[Documentation: {path}]"
+            header = _DOC_HEADER(metadata.get("path", "unknown"))
         elif doc_type == "commit":
-            sha = metadata.get("sha", "unknown")[:8]
-            message = metadata.get("message", "")
-            header = f"[Commit {sha}: {message}]"
+            header = _COMMIT_HEADER(metadata.get("sha", "unknown")[:8], metadata.get("message", ""))
         else:
             header = f"[{doc_type}]"
         
-        context_parts.append(f"{header}\n{doc}\n")
+        if total_chars:
+            out.write("\n---\n\n")
+        out.write(f"{header}\n{doc}\n")
         total_chars += len(doc) + len(header) + 2
     
-    if not context_parts:
+    if not total_chars:
         return "No relevant context found within size limits."
     
-    context = "\n---\n\n".join(context_parts)
-    return context
+    return out.getvalue()
 
 
 def search_repo(
@@ -89,7 +162,8 @@ def search_repo(
     repo_url: str,
     k: int = 10,
     persist_dir: str = ".vectordb",
-    collection_name: str | None = None
+    collection_name: str | None = None,
+    doc_types: List[str] | None = None
 ) -> List[Dict[str, Any]]:
     """
     Search repository and return raw results for debugging.
@@ -100,6 +174,7 @@ def search_repo(
         k: Number of results
         persist_dir: Vector database directory
         collection_name: Optional custom collection name
+        doc_types: Only search chunks of these types; default searches all
         
     Returns:
         List of result dicts with document, metadata, and distance
@@ -108,31 +183,16 @@ def search_repo(
         repo_hash = get_repo_hash(repo_url)
         collection_name = f"repo_{repo_hash}"
     
-    client = get_client(persist_dir)
-    
-    try:
-        collection = get_or_create_collection(client, collection_name)
-    except Exception as e:
-        return [{"error": str(e)}]
-    
-    results = collection.query(
-        query_texts=[query],
-        n_results=k,
-        include=["documents", "metadatas", "distances"]
-    )
-    
-    if not results["documents"] or not results["documents"][0]:
-        return []
+    rows = _query(query, k, persist_dir, collection_name, doc_types)
+    if rows is None:
+        return [{"error": f"Collection '{collection_name}' not found. Please index the repository first."}]
     
     formatted_results = []
-    for doc, metadata, distance in zip(
-        results["documents"][0],
-        results["metadatas"][0],
-        results["distances"][0]
-    ):
+    for doc, metadata, distance in _iter_results(rows):
         formatted_results.append({
             "document": doc,
-            "metadata": metadata,
+            # Callers own their results; the cached mapping stays untouched
+            "metadata": dict(metadata),
             "distance": distance
         })
     
@@ -3,12 +3,12 @@ import hashlib
 from pathlib import Path
 import chromadb
 from chromadb.config import Settings
-from .embeddings import FastEmbedEmbeddingFunction
+from .embeddings import FastEmbedEmbeddingFunction, get_default_embedding_function
 
 
 def get_repo_hash(repo_url: str) -> str:
-    """Generate a stable hash for a repository URL."""
-    return hashlib.sha256(repo_url.encode()).hexdigest()[:16]
+    """Generate a stable hash for a repository URL (16 hex chars)."""
+    return hashlib.blake2b(repo_url.encode(), digest_size=8).hexdigest()
 
 
 def get_client(persist_dir: str = ".vectordb") -> chromadb.PersistentClient:
@@ -39,14 +39,17 @@ def get_or_create_collection(
     Args:
         client: Chroma client
         collection_name: Name of the collection
-        embedding_function: Optional custom embedding function
+        embedding_function: Optional custom embedding function (default: the
+            shared default-model instance)
         
     Returns:
         Chroma Collection instance
     """
     if embedding_function is None:
-        embedding_function = FastEmbedEmbeddingFunction()
+        embedding_function = get_default_embedding_function()
     
+    # Chroma's HNSW index stores float32 vectors only; int8/float16 input is
+    # converted back on insert, so quantizing here would save nothing
     return client.get_or_create_collection(
         name=collection_name,
         embedding_function=embedding_function,
@@ -54,6 +57,35 @@ def get_or_create_collection(
     )
 
 
+def get_collection(
+    client: chromadb.PersistentClient,
+    collection_name: str,
+    embedding_function: FastEmbedEmbeddingFunction | None = None
+):
+    """
+    Get an existing collection for querying, without creating it.
+    
+    Args:
+        client: Chroma client
+        collection_name: Name of the collection
+        embedding_function: Optional custom embedding function (default: the
+            shared default-model instance)
+        
+    Returns:
+        Chroma Collection instance
+        
+    Raises:
+        Exception: If the collection does not exist (repository not indexed)
+    """
+    if embedding_function is None:
+        embedding_function = get_default_embedding_function()
+    
+    return client.get_collection(
+        name=collection_name,
+        embedding_function=embedding_function
+    )
+
+
 def delete_collection(client: chromadb.PersistentClient, collection_name: str):
     """Delete a collection if it exists."""
     try: